@@ -1,29 +1,96 @@
 import asyncio
 import hashlib
 import json
+import os
 import time
+import zlib
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import aiosqlite
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from config import settings
+from urls import normalize_url
+
+
+_ZSTD = b"Z"
+_ZLIB = b"z"
+
+# Resolves a normalized URL hash through the alias table to the hash its
+# content is stored under (the hash of the canonical URL).
+_RESOLVE_URL_HASH = "COALESCE((SELECT url_hash FROM url_alias WHERE alias_hash = ?), ?)"
+
+# Tables that hold payloads, with their key column; these share the byte budget.
+_PAYLOAD_TABLES = {
+    "search_cache": "query_hash",
+    "content_cache": "url_hash",
+    "summary_cache": "summary_key",
+}
+
+
+def compress(text: str) -> bytes:
+    data = text.encode()
+    if zstandard is not None:
+        return _ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return _ZLIB + zlib.compress(data, 6)
+
+
+def decompress(value: bytes | str | None) -> str | None:
+    # Rows written before compression was added are plain TEXT.
+    if value is None or isinstance(value, str):
+        return value
+    codec, data = value[:1], value[1:]
+    if codec == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this cache entry")
+        return zstandard.ZstdDecompressor().decompress(data).decode()
+    return zlib.decompress(data).decode()
 
 
 class Cache:
-    def __init__(self, db_path: str | None = None):
+    def __init__(
+        self,
+        db_path: str | None = None,
+        read_connections: int | None = None,
+        write_batch_size: int | None = None,
+    ):
         self.db_path = db_path or f"{settings.cache_dir}/cache.db"
+        self.read_connections = read_connections or settings.cache_read_connections
+        self.write_batch_size = write_batch_size or settings.cache_write_batch_size
+        self.max_bytes = settings.cache_max_bytes
+        self.evictions = 0
+        self.expired = 0
         self._db: aiosqlite.Connection | None = None
-        self._lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._writes: asyncio.Queue | None = None
+        self._writer_task: asyncio.Task | None = None
 
     async def initialize(self) -> None:
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self._db = await aiosqlite.connect(self.db_path)
+
+        cursor = await self._db.execute("PRAGMA auto_vacuum")
+        if (await cursor.fetchone())[0] != 2:
+            # Switching an existing database to incremental mode needs a full VACUUM.
+            await self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            await self._db.execute("VACUUM")
+
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
         await self._db.execute("""
             CREATE TABLE IF NOT EXISTS search_cache (
                 query_hash TEXT PRIMARY KEY,
                 results TEXT,
                 created_at REAL,
-                expires_at REAL
+                expires_at REAL,
+                size_bytes INTEGER DEFAULT 0,
+                last_accessed REAL,
+                exhausted INTEGER DEFAULT 0
             )
         """)
         await self._db.execute("""
@@ -33,16 +100,177 @@ class Cache:
                 markdown TEXT,
                 content_hash TEXT,
                 fetched_at REAL,
-                expires_at REAL
+                expires_at REAL,
+                size_bytes INTEGER DEFAULT 0,
+                last_accessed REAL,
+                etag TEXT,
+                last_modified TEXT,
+                truncated INTEGER DEFAULT 0
+            )
+        """)
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                summary_key TEXT PRIMARY KEY,
+                summary TEXT,
+                created_at REAL,
+                expires_at REAL,
+                size_bytes INTEGER DEFAULT 0,
+                last_accessed REAL
+            )
+        """)
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS url_alias (
+                alias_hash TEXT PRIMARY KEY,
+                url_hash TEXT
+            )
+        """)
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_url_alias_url_hash ON url_alias (url_hash)"
+        )
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS html_snapshot (
+                url_hash TEXT PRIMARY KEY,
+                canonical_url TEXT,
+                html BLOB,
+                html_hash TEXT,
+                rendered INTEGER DEFAULT 0,
+                fetched_at REAL,
+                expires_at REAL,
+                size_bytes INTEGER DEFAULT 0,
+                last_accessed REAL
             )
         """)
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_html_snapshot_last_accessed "
+            "ON html_snapshot (last_accessed)"
+        )
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS domain_profile (
+                domain TEXT PRIMARY KEY,
+                stats TEXT,
+                updated_at REAL
+            )
+        """)
+        for table, payload in (("search_cache", "results"), ("content_cache", "markdown")):
+            if await self._add_missing_column(table, "size_bytes", "INTEGER DEFAULT 0"):
+                await self._db.execute(f"UPDATE {table} SET size_bytes = LENGTH({payload})")
+            await self._add_missing_column(table, "last_accessed", "REAL")
+        for table in _PAYLOAD_TABLES:
+            await self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_last_accessed "
+                f"ON {table} (last_accessed)"
+            )
+        await self._add_missing_column("search_cache", "exhausted", "INTEGER DEFAULT 0")
+        await self._add_missing_column("content_cache", "etag", "TEXT")
+        await self._add_missing_column("content_cache", "last_modified", "TEXT")
+        await self._add_missing_column("content_cache", "truncated", "INTEGER DEFAULT 0")
         await self._db.commit()
 
+        self._readers = asyncio.Queue()
+        for _ in range(self.read_connections):
+            reader = await aiosqlite.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            self._readers.put_nowait(reader)
+
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
     async def close(self) -> None:
+        if self._writer_task:
+            self._writes.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        if self._readers:
+            while not self._readers.empty():
+                await self._readers.get_nowait().close()
+            self._readers = None
         if self._db:
             await self._db.close()
             self._db = None
 
+    async def _add_missing_column(self, table: str, column: str, decl: str) -> bool:
+        cursor = await self._db.execute(f"PRAGMA table_info({table})")
+        columns = {row[1] for row in await cursor.fetchall()}
+        if column in columns:
+            return False
+        await self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        return True
+
+    @asynccontextmanager
+    async def _reader(self):
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+
+    async def _fetchone(self, sql: str, params: tuple) -> tuple | None:
+        async with self._reader() as db:
+            cursor = await db.execute(sql, params)
+            return await cursor.fetchone()
+
+    async def _fetchall(self, sql: str, params: tuple = ()) -> list[tuple]:
+        async with self._reader() as db:
+            cursor = await db.execute(sql, params)
+            return await cursor.fetchall()
+
+    async def _write(self, sql: str, params: tuple = ()) -> int:
+        future = asyncio.get_running_loop().create_future()
+        self._writes.put_nowait((sql, params, future))
+        return await future
+
+    def _write_nowait(self, sql: str, params: tuple) -> None:
+        self._writes.put_nowait((sql, params, None))
+
+    def _touch(self, table: str, key_column: str, key: str) -> None:
+        self._write_nowait(
+            f"UPDATE {table} SET last_accessed = ? WHERE {key_column} = ?",
+            (time.time(), key)
+        )
+
+    async def _writer_loop(self) -> None:
+        while True:
+            op = await self._writes.get()
+            if op is None:
+                return
+
+            batch = [op]
+            stop = False
+            while len(batch) < self.write_batch_size and not self._writes.empty():
+                op = self._writes.get_nowait()
+                if op is None:
+                    stop = True
+                    break
+                batch.append(op)
+
+            await self._commit_batch(batch)
+            if stop:
+                return
+
+    async def _commit_batch(self, batch: list[tuple]) -> None:
+        try:
+            rowcounts = []
+            for sql, params, _ in batch:
+                cursor = await self._db.execute(sql, params)
+                if sql.startswith("PRAGMA"):
+                    await cursor.fetchall()
+                rowcounts.append(cursor.rowcount)
+            await self._db.commit()
+        except Exception as e:
+            await self._db.rollback()
+            if len(batch) > 1:
+                # Retry one by one so a single bad write does not fail the rest.
+                for op in batch:
+                    await self._commit_batch([op])
+                return
+            _, _, future = batch[0]
+            if future and not future.done():
+                future.set_exception(e)
+            return
+
+        for (_, _, future), rowcount in zip(batch, rowcounts):
+            if future and not future.done():
+                future.set_result(rowcount)
+
     @staticmethod
     def hash_query(query: str, engines: list[str] | None = None) -> str:
         key = f"{query}:{sorted(engines) if engines else ''}"
@@ -50,27 +278,53 @@ class Cache:
 
     @staticmethod
     def hash_url(url: str) -> str:
-        return hashlib.sha256(url.encode()).hexdigest()[:16]
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()[:16]
 
     @staticmethod
     def hash_content(content: str) -> str:
         return hashlib.sha256(content.encode()).hexdigest()[:16]
 
-    async def get_search(self, query: str, engines: list[str] | None = None) -> list[dict] | None:
+    @staticmethod
+    def hash_summary(
+        content_hash: str,
+        focus: str | None,
+        model: str,
+        max_length: int
+    ) -> str:
+        # The model only sees the passages that fit the budget, so the
+        # passage settings decide what a summary was built from.
+        key = (
+            f"{content_hash}:{focus or ''}:{model}:{max_length}:"
+            f"{settings.summary_token_budget}:{settings.passage_max_chars}"
+        )
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    async def get_search(
+        self,
+        query: str,
+        engines: list[str] | None = None,
+        allow_stale: bool = False
+    ) -> dict | None:
+        """Cached hits, and whether they are all the hits the query has."""
         if not self._db:
             return None
 
         query_hash = self.hash_query(query, engines)
         now = time.time()
-
-        async with self._lock:
-            cursor = await self._db.execute(
-                "SELECT results FROM search_cache WHERE query_hash = ? AND expires_at > ?",
-                (query_hash, now)
-            )
-            row = await cursor.fetchone()
-            if row:
-                return json.loads(row[0])
+        stale_window = settings.cache_stale_search if allow_stale else 0
+
+        row = await self._fetchone(
+            "SELECT results, expires_at, exhausted FROM search_cache "
+            "WHERE query_hash = ? AND expires_at > ?",
+            (query_hash, now - stale_window)
+        )
+        if row:
+            self._touch("search_cache", "query_hash", query_hash)
+            results = json.loads(decompress(row[0]))
+            if row[1] <= now:
+                for result in results:
+                    result["stale"] = True
+            return {"hits": results, "exhausted": bool(row[2])}
         return None
 
     async def set_search(
@@ -78,7 +332,8 @@ class Cache:
         query: str,
         results: list[dict],
         engines: list[str] | None = None,
-        ttl: int | None = None
+        ttl: int | None = None,
+        exhausted: bool = False
     ) -> None:
         if not self._db:
             return
@@ -87,63 +342,312 @@ class Cache:
         now = time.time()
         ttl = ttl or settings.cache_ttl_search
 
-        async with self._lock:
-            await self._db.execute(
-                """INSERT OR REPLACE INTO search_cache
-                   (query_hash, results, created_at, expires_at)
-                   VALUES (?, ?, ?, ?)""",
-                (query_hash, json.dumps(results), now, now + ttl)
-            )
-            await self._db.commit()
-
-    async def get_content(self, url: str) -> dict | None:
+        blob = compress(json.dumps(results))
+
+        await self._write(
+            """INSERT OR REPLACE INTO search_cache
+               (query_hash, results, created_at, expires_at, size_bytes, last_accessed,
+                exhausted)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (query_hash, blob, now, now + ttl, len(blob), now, int(exhausted))
+        )
+
+    async def get_content(
+        self, url: str, allow_stale: bool = False, ignore_expiry: bool = False
+    ) -> dict | None:
+        """ignore_expiry returns the row however old, e.g. right after a
+        revalidation that gave it a zero TTL."""
         if not self._db:
             return None
 
         url_hash = self.hash_url(url)
         now = time.time()
-
-        async with self._lock:
-            cursor = await self._db.execute(
-                """SELECT canonical_url, markdown, content_hash, fetched_at
-                   FROM content_cache
-                   WHERE url_hash = ? AND expires_at > ?""",
-                (url_hash, now)
-            )
-            row = await cursor.fetchone()
-            if row:
-                return {
-                    "canonical_url": row[0],
-                    "markdown": row[1],
-                    "content_hash": row[2],
-                    "fetched_at": row[3],
-                    "from_cache": True
-                }
+        stale_window = settings.cache_stale_content if allow_stale else 0
+        min_expires = float("-inf") if ignore_expiry else now - stale_window
+
+        row = await self._fetchone(
+            f"""SELECT canonical_url, markdown, content_hash, fetched_at, url_hash, expires_at,
+                       truncated
+                FROM content_cache
+                WHERE url_hash = {_RESOLVE_URL_HASH} AND expires_at > ?""",
+            (url_hash, url_hash, min_expires)
+        )
+        if row:
+            self._touch("content_cache", "url_hash", row[4])
+            return {
+                "canonical_url": row[0],
+                "markdown": decompress(row[1]),
+                "content_hash": row[2],
+                "fetched_at": row[3],
+                "from_cache": True,
+                "stale": row[5] <= now,
+                "truncated": bool(row[6])
+            }
         return None
 
+    async def get_content_many(
+        self, urls: list[str], allow_stale: bool = False
+    ) -> dict[str, dict]:
+        """Look up several URLs in one query; misses are left out of the result."""
+        if not self._db or not urls:
+            return {}
+
+        hashes = {url: self.hash_url(url) for url in urls}
+        now = time.time()
+        stale_window = settings.cache_stale_content if allow_stale else 0
+
+        rows = await self._fetchall(
+            """SELECT k.value, c.canonical_url, c.markdown, c.content_hash,
+                      c.fetched_at, c.url_hash, c.expires_at, c.truncated
+               FROM json_each(?) AS k
+               LEFT JOIN url_alias AS a ON a.alias_hash = k.value
+               JOIN content_cache AS c ON c.url_hash = COALESCE(a.url_hash, k.value)
+               WHERE c.expires_at > ?""",
+            (json.dumps(sorted(set(hashes.values()))), now - stale_window)
+        )
+
+        entries = {}
+        for row in rows:
+            self._touch("content_cache", "url_hash", row[5])
+            entries[row[0]] = {
+                "canonical_url": row[1],
+                "markdown": decompress(row[2]),
+                "content_hash": row[3],
+                "fetched_at": row[4],
+                "from_cache": True,
+                "stale": row[6] <= now,
+                "truncated": bool(row[7])
+            }
+        return {url: entries[h] for url, h in hashes.items() if h in entries}
+
     async def set_content(
         self,
         url: str,
         canonical_url: str,
         markdown: str,
-        ttl: int | None = None
+        ttl: int | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        truncated: bool = False
     ) -> None:
         if not self._db:
             return
 
-        url_hash = self.hash_url(url)
+        # Content is stored once under the canonical URL; the request URL
+        # becomes an alias so both resolve to the same entry.
+        alias_hash = self.hash_url(url)
+        url_hash = self.hash_url(canonical_url or url)
         content_hash = self.hash_content(markdown)
         now = time.time()
-        ttl = ttl or settings.cache_ttl_content
+        ttl = settings.cache_ttl_content if ttl is None else ttl
+
+        blob = compress(markdown)
+
+        writes = [self._write(
+            """INSERT OR REPLACE INTO content_cache
+               (url_hash, canonical_url, markdown, content_hash, fetched_at, expires_at,
+                size_bytes, last_accessed, etag, last_modified, truncated)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (url_hash, canonical_url, blob, content_hash, now, now + ttl, len(blob), now,
+             etag, last_modified, int(truncated))
+        )]
+        if alias_hash != url_hash:
+            writes.append(self._write(
+                "INSERT OR REPLACE INTO url_alias (alias_hash, url_hash) VALUES (?, ?)",
+                (alias_hash, url_hash)
+            ))
+        await asyncio.gather(*writes)
+
+    async def get_summary(
+        self,
+        content_hash: str,
+        focus: str | None,
+        model: str,
+        max_length: int
+    ) -> str | None:
+        if not self._db:
+            return None
 
-        async with self._lock:
-            await self._db.execute(
-                """INSERT OR REPLACE INTO content_cache
-                   (url_hash, canonical_url, markdown, content_hash, fetched_at, expires_at)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (url_hash, canonical_url, markdown, content_hash, now, now + ttl)
+        summary_key = self.hash_summary(content_hash, focus, model, max_length)
+
+        row = await self._fetchone(
+            "SELECT summary FROM summary_cache WHERE summary_key = ? AND expires_at > ?",
+            (summary_key, time.time())
+        )
+        if row:
+            self._touch("summary_cache", "summary_key", summary_key)
+            return decompress(row[0])
+        return None
+
+    async def set_summary(
+        self,
+        content_hash: str,
+        focus: str | None,
+        model: str,
+        max_length: int,
+        summary: str,
+        ttl: int | None = None
+    ) -> None:
+        if not self._db:
+            return
+
+        summary_key = self.hash_summary(content_hash, focus, model, max_length)
+        now = time.time()
+        ttl = ttl or settings.cache_ttl_summary
+        blob = compress(summary)
+
+        await self._write(
+            """INSERT OR REPLACE INTO summary_cache
+               (summary_key, summary, created_at, expires_at, size_bytes, last_accessed)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (summary_key, blob, now, now + ttl, len(blob), now)
+        )
+
+    async def set_snapshot(
+        self,
+        url: str,
+        canonical_url: str,
+        html: str,
+        rendered: bool = False
+    ) -> None:
+        if not self._db:
+            return
+
+        alias_hash = self.hash_url(url)
+        url_hash = self.hash_url(canonical_url or url)
+        html_hash = self.hash_content(html)
+        now = time.time()
+        expires_at = now + settings.cache_ttl_snapshot
+
+        if alias_hash != url_hash:
+            self._write_nowait(
+                "INSERT OR REPLACE INTO url_alias (alias_hash, url_hash) VALUES (?, ?)",
+                (alias_hash, url_hash)
             )
-            await self._db.commit()
+
+        # An unchanged page only extends the snapshot it already has.
+        updated = await self._write(
+            """UPDATE html_snapshot SET fetched_at = ?, expires_at = ?, last_accessed = ?
+               WHERE url_hash = ? AND html_hash = ?""",
+            (now, expires_at, now, url_hash, html_hash)
+        )
+        if updated:
+            return
+
+        blob = compress(html)
+        await self._write(
+            """INSERT OR REPLACE INTO html_snapshot
+               (url_hash, canonical_url, html, html_hash, rendered, fetched_at, expires_at,
+                size_bytes, last_accessed)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (url_hash, canonical_url, blob, html_hash, int(rendered), now, expires_at,
+             len(blob), now)
+        )
+
+    async def get_snapshot(self, url: str) -> dict | None:
+        if not self._db:
+            return None
+
+        url_hash = self.hash_url(url)
+        row = await self._fetchone(
+            f"""SELECT canonical_url, html, html_hash, rendered, fetched_at, url_hash
+                FROM html_snapshot
+                WHERE url_hash = {_RESOLVE_URL_HASH} AND expires_at > ?""",
+            (url_hash, url_hash, time.time())
+        )
+        if row:
+            self._touch("html_snapshot", "url_hash", row[5])
+            return {
+                "canonical_url": row[0],
+                "html": decompress(row[1]),
+                "html_hash": row[2],
+                "rendered": bool(row[3]),
+                "fetched_at": row[4],
+            }
+        return None
+
+    async def list_snapshot_urls(self, after: str = "", limit: int = 100) -> list[str]:
+        """Canonical URLs of live snapshots, in pages ordered by URL."""
+        if not self._db:
+            return []
+
+        rows = await self._fetchall(
+            """SELECT canonical_url FROM html_snapshot
+               WHERE canonical_url > ? AND expires_at > ?
+               ORDER BY canonical_url LIMIT ?""",
+            (after, time.time(), limit)
+        )
+        return [row[0] for row in rows]
+
+    async def replace_markdown(self, url: str, markdown: str) -> bool:
+        """Swap in newly extracted markdown, keeping expiry and validators."""
+        if not self._db:
+            return False
+
+        url_hash = self.hash_url(url)
+        blob = compress(markdown)
+        updated = await self._write(
+            f"""UPDATE content_cache
+                SET markdown = ?, content_hash = ?, size_bytes = ?
+                WHERE url_hash = {_RESOLVE_URL_HASH}""",
+            (blob, self.hash_content(markdown), len(blob), url_hash, url_hash)
+        )
+        return updated > 0
+
+    async def get_domain_profiles(self) -> dict[str, dict]:
+        if not self._db:
+            return {}
+
+        rows = await self._fetchall("SELECT domain, stats FROM domain_profile")
+        return {domain: json.loads(stats) for domain, stats in rows}
+
+    def set_domain_profile(self, domain: str, stats: dict) -> None:
+        if not self._db:
+            return
+
+        self._write_nowait(
+            "INSERT OR REPLACE INTO domain_profile (domain, stats, updated_at) VALUES (?, ?, ?)",
+            (domain, json.dumps(stats), time.time())
+        )
+
+    async def get_validators(self, url: str) -> dict | None:
+        if not self._db:
+            return None
+
+        url_hash = self.hash_url(url)
+
+        row = await self._fetchone(
+            f"""SELECT etag, last_modified FROM content_cache
+                WHERE url_hash = {_RESOLVE_URL_HASH}
+                  AND (etag IS NOT NULL OR last_modified IS NOT NULL)""",
+            (url_hash, url_hash)
+        )
+        if row:
+            return {"etag": row[0], "last_modified": row[1]}
+        return None
+
+    async def refresh_content(
+        self,
+        url: str,
+        ttl: int | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None
+    ) -> bool:
+        if not self._db:
+            return False
+
+        url_hash = self.hash_url(url)
+        now = time.time()
+        ttl = settings.cache_ttl_content if ttl is None else ttl
+
+        updated = await self._write(
+            f"""UPDATE content_cache
+                SET fetched_at = ?, expires_at = ?, last_accessed = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url_hash = {_RESOLVE_URL_HASH}""",
+            (now, now + ttl, now, etag, last_modified, url_hash, url_hash)
+        )
+        return updated > 0
 
     async def get_content_hash(self, url: str) -> str | None:
         if not self._db:
@@ -151,14 +655,12 @@ class Cache:
 
         url_hash = self.hash_url(url)
 
-        async with self._lock:
-            cursor = await self._db.execute(
-                "SELECT content_hash FROM content_cache WHERE url_hash = ?",
-                (url_hash,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                return row[0]
+        row = await self._fetchone(
+            f"SELECT content_hash FROM content_cache WHERE url_hash = {_RESOLVE_URL_HASH}",
+            (url_hash, url_hash)
+        )
+        if row:
+            return row[0]
         return None
 
     async def invalidate_search(self, query: str, engines: list[str] | None = None) -> None:
@@ -167,12 +669,10 @@ class Cache:
 
         query_hash = self.hash_query(query, engines)
 
-        async with self._lock:
-            await self._db.execute(
-                "DELETE FROM search_cache WHERE query_hash = ?",
-                (query_hash,)
-            )
-            await self._db.commit()
+        await self._write(
+            "DELETE FROM search_cache WHERE query_hash = ?",
+            (query_hash,)
+        )
 
     async def invalidate_content(self, url: str) -> None:
         if not self._db:
@@ -180,34 +680,147 @@ class Cache:
 
         url_hash = self.hash_url(url)
 
-        async with self._lock:
-            await self._db.execute(
-                "DELETE FROM content_cache WHERE url_hash = ?",
+        await asyncio.gather(
+            self._write(
+                f"DELETE FROM content_cache WHERE url_hash = {_RESOLVE_URL_HASH}",
+                (url_hash, url_hash)
+            ),
+            self._write(
+                "DELETE FROM url_alias WHERE alias_hash = ?",
                 (url_hash,)
-            )
-            await self._db.commit()
+            ),
+        )
 
     async def cleanup_expired(self) -> int:
         if not self._db:
             return 0
 
         now = time.time()
-        deleted = 0
-
-        async with self._lock:
-            cursor = await self._db.execute(
-                "DELETE FROM search_cache WHERE expires_at < ?", (now,)
-            )
-            deleted += cursor.rowcount
 
-            cursor = await self._db.execute(
-                "DELETE FROM content_cache WHERE expires_at < ?", (now,)
-            )
-            deleted += cursor.rowcount
+        deleted = await asyncio.gather(
+            self._write(
+                "DELETE FROM search_cache WHERE expires_at < ?",
+                (now - settings.cache_stale_search,)
+            ),
+            self._write(
+                "DELETE FROM content_cache WHERE expires_at < ?",
+                (now - max(settings.cache_revalidate_window, settings.cache_stale_content),)
+            ),
+            self._write("DELETE FROM summary_cache WHERE expires_at < ?", (now,)),
+            self._write("DELETE FROM html_snapshot WHERE expires_at < ?", (now,)),
+            self._write(
+                "DELETE FROM domain_profile WHERE updated_at < ?",
+                (now - settings.cache_ttl_domain_profile,)
+            ),
+        )
+
+        self.expired += sum(deleted)
+        return sum(deleted)
+
+    async def evict_to_budget(self) -> int:
+        evicted = await self._evict(_PAYLOAD_TABLES, self.max_bytes)
+        evicted += await self._evict(
+            {"html_snapshot": "url_hash"}, settings.cache_snapshot_max_bytes
+        )
+        return evicted
+
+    async def _evict(self, tables: dict[str, str], max_bytes: int) -> int:
+        """Delete least recently used rows until tables fit in max_bytes together."""
+        if not self._db or max_bytes <= 0:
+            return 0
 
-            await self._db.commit()
+        row = await self._fetchone(
+            "SELECT " + " + ".join(
+                f"(SELECT COALESCE(SUM(size_bytes), 0) FROM {table})"
+                for table in tables
+            ),
+            ()
+        )
+        excess = row[0] - max_bytes
+        if excess <= 0:
+            return 0
 
-        return deleted
+        rows = await self._fetchall(
+            " UNION ALL ".join(
+                f"SELECT '{table}', {key_column}, size_bytes, last_accessed FROM {table}"
+                for table, key_column in tables.items()
+            ) + " ORDER BY last_accessed ASC"
+        )
+
+        victims: dict[str, list[str]] = {table: [] for table in tables}
+        for table, key, size_bytes, _ in rows:
+            if excess <= 0:
+                break
+            victims[table].append(key)
+            excess -= size_bytes or 0
+
+        evicted = 0
+        for table, key_column in tables.items():
+            keys = victims[table]
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                evicted += await self._write(
+                    f"DELETE FROM {table} WHERE {key_column} IN ({','.join('?' * len(chunk))})",
+                    tuple(chunk)
+                )
+
+        self.evictions += evicted
+        return evicted
+
+    async def maintain(self) -> None:
+        if not self._db:
+            return
+        await self.cleanup_expired()
+        await self.evict_to_budget()
+        await self._write(
+            """DELETE FROM url_alias
+               WHERE url_hash NOT IN (SELECT url_hash FROM content_cache)
+                 AND url_hash NOT IN (SELECT url_hash FROM html_snapshot)"""
+        )
+        await self._write(f"PRAGMA incremental_vacuum({settings.cache_vacuum_pages})")
+
+    async def run_maintenance(self, interval: int | None = None) -> None:
+        interval = interval or settings.cache_maintenance_interval
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                pass
+            await asyncio.sleep(interval)
+
+    async def stats(self) -> dict:
+        if not self._db:
+            return {}
+
+        row = await self._fetchone(
+            """SELECT (SELECT COUNT(*) FROM search_cache),
+                      (SELECT COUNT(*) FROM content_cache),
+                      (SELECT COUNT(*) FROM summary_cache),
+                      (SELECT COALESCE(SUM(size_bytes), 0) FROM search_cache)
+                    + (SELECT COALESCE(SUM(size_bytes), 0) FROM content_cache)
+                    + (SELECT COALESCE(SUM(size_bytes), 0) FROM summary_cache),
+                      (SELECT COUNT(*) FROM html_snapshot),
+                      (SELECT COALESCE(SUM(size_bytes), 0) FROM html_snapshot)""",
+            ()
+        )
+        bytes_on_disk = sum(
+            os.path.getsize(path)
+            for path in (self.db_path, f"{self.db_path}-wal")
+            if os.path.exists(path)
+        )
+        return {
+            "entries": row[0] + row[1] + row[2],
+            "search_entries": row[0],
+            "content_entries": row[1],
+            "summary_entries": row[2],
+            "payload_bytes": row[3],
+            "snapshot_entries": row[4],
+            "snapshot_bytes": row[5],
+            "bytes_on_disk": bytes_on_disk,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
 
 
 # Global cache instance
@@ -4,20 +4,107 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # SearXNG Configuration
     searxng_url: str = "http://searxng:8080"
+    searxng_min_results: int = 20  # hits cached per query, topped up in the background
+    searxng_pages: int = 2  # most result pages requested in parallel per round
+    searxng_page_size: int = 10  # hits expected per page, to size each round
+    searxng_max_pages: int = 4
+    searxng_deadline: float = 8.0  # seconds; later responses are dropped
+    searxng_split_engines: bool = False  # query each requested engine separately
 
     # Ollama Configuration
     ollama_host: str = "http://host.docker.internal:11434"
     ollama_model: str = "gpt-oss:20b"
+    ollama_max_concurrency: int = 2  # requests sent to Ollama at once; the rest queue here
+
+    # Summary Input Configuration
+    summary_token_budget: int = 2500  # estimated tokens of page content sent per summary
+    passage_max_chars: int = 800  # markdown is split into passages of up to this size
 
     # Cache Configuration
     cache_dir: str = "/app/data"
     cache_ttl_search: int = 1800  # 30 minutes
+    cache_ttl_search_partial: int = 60  # hits cut short by the search deadline
     cache_ttl_content: int = 86400  # 24 hours
+    cache_ttl_summary: int = 604800  # 7 days, keyed on content hash
+    cache_ttl_domain_profile: int = 2592000  # 30 days since the domain was last fetched
+    cache_ttl_snapshot: int = 604800  # 7 days of raw HTML for re-extraction
+    cache_stale_search: int = 600  # serve expired search results 10 minutes while refreshing
+    cache_stale_content: int = 3600  # serve expired content 1 hour while refreshing
+    cache_revalidate_window: int = 604800  # keep expired content 7 days for conditional refetch
+    cache_read_connections: int = 4
+    cache_write_batch_size: int = 64
+    cache_max_bytes: int = 1024 * 1024 * 1024  # 1 GiB of stored payload, 0 = unbounded
+    cache_snapshots: bool = False  # keep raw HTML so pages can be re-extracted offline
+    cache_snapshot_max_bytes: int = 512 * 1024 * 1024  # separate budget for raw HTML
+    cache_maintenance_interval: int = 300  # 5 minutes
+    cache_vacuum_pages: int = 1000
+
+    # Extraction Configuration
+    extract_workers: int = 2  # 0 runs extraction in a thread instead
+    extract_queue_size: int = 32
+    extract_timeout: float = 20.0
+    extract_max_html_chars: int = 5_000_000
+
+    # HTTP Client Configuration
+    fetch_http2: bool = True
+    fetch_max_connections: int = 100
+    fetch_max_keepalive_connections: int = 20
+    fetch_keepalive_expiry: float = 30.0
+    fetch_connect_timeout: float = 5.0
+    fetch_read_timeout: float = 15.0
+    fetch_dns_ttl: int = 300  # seconds, 0 disables the DNS cache
+    fetch_max_body_bytes: int = 10 * 1024 * 1024  # larger bodies are truncated
+
+    # Fetch Politeness Configuration
+    fetch_host_concurrency: int = 2  # requests in flight per host
+    fetch_host_interval: float = 0.25  # seconds between request starts per host
+    fetch_max_retry_after: float = 10.0  # wait and retry once on 429/503 up to this long
+
+    # Batch Fetch Configuration
+    fetch_batch_concurrency: int = 8
+    fetch_batch_max_urls: int = 100
 
     # Playwright Configuration
     playwright_max_contexts: int = 3
+    playwright_prewarm: bool = True  # launch the browser at startup
+    playwright_check_interval: int = 30  # seconds between browser health checks
+    playwright_max_rss_bytes: int = 2 * 1024 * 1024 * 1024  # recycle above this, 0 = never
+    playwright_warm_contexts: int = 1  # created when the browser starts
+    playwright_context_max_uses: int = 50
+    playwright_context_max_age: int = 600  # seconds
+    playwright_navigation_timeout: float = 30.0
+    playwright_ready_timeout: float = 10.0  # hard deadline for the page to settle
+    playwright_ready_quiet_ms: int = 500  # DOM or text unchanged this long = ready
+    playwright_blocked_resource_types: list[str] = ["image", "media", "font"]
+
+    # Tracker and ad domains never loaded by JS renders (subdomains included)
+    playwright_blocked_domains: list[str] = [
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "googletagservices.com",
+        "connect.facebook.net",
+        "amazon-adsystem.com",
+        "adnxs.com",
+        "criteo.com",
+        "taboola.com",
+        "outbrain.com",
+        "scorecardresearch.com",
+        "quantserve.com",
+        "chartbeat.com",
+        "hotjar.com",
+        "segment.io",
+        "mixpanel.com",
+        "optimizely.com",
+        "nr-data.net",
+    ]
+
+    # Render Strategy Configuration
+    render_explore_rate: float = 0.05  # share of JS-preferring fetches that try the fast path first
 
-    # Known SPA domains that require JS rendering
+    # Known SPA domains that require JS rendering, until their profile says otherwise
     spa_domains: list[str] = [
         "medium.com",
         "substack.com",
@@ -0,0 +1,29 @@
+import asyncio
+
+# Work that outlived its request's deadline, kept referenced until it is done.
+_background: set[asyncio.Task] = set()
+
+
+def deadline_after(timeout_ms: int | None) -> float | None:
+    """Event loop time at which a request with timeout_ms budget is due."""
+    if timeout_ms is None:
+        return None
+    return asyncio.get_running_loop().time() + timeout_ms / 1000
+
+
+def remaining(deadline: float | None) -> float | None:
+    if deadline is None:
+        return None
+    return max(deadline - asyncio.get_running_loop().time(), 0.0)
+
+
+def detach(task: asyncio.Task) -> None:
+    """Let task finish in the background after its caller stopped waiting."""
+    _background.add(task)
+    task.add_done_callback(_finished)
+
+
+def _finished(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable
+
+from fastapi import Request, Response
+
+
+async def until_disconnected(request: Request, awaitable: Awaitable[Any], poll: float = 0.5) -> Any:
+    """Await awaitable, cancelling it if the client disconnects first.
+
+    Plain responses are not cancelled by the server when the client goes
+    away, so long-running handlers poll for it instead.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    return await task
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    # Nobody is left to read it; nginx's "client closed request".
+                    return Response(status_code=499)
+    finally:
+        task.cancel()
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -8,22 +9,31 @@ from fastapi.responses import RedirectResponse
 from cache import cache
 from services.searxng import searxng_client
 from services.fetcher import fetcher
+from services.extractor import extraction_pool
 from services.summarizer import summarizer
-from routers import search_router, fetch_router, health_router
+from services.reextract import reextract_jobs
+from routers import search_router, fetch_router, health_router, snapshots_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await cache.initialize()
+    maintenance = asyncio.create_task(cache.run_maintenance())
     await searxng_client.initialize()
     await fetcher.initialize()
+    browser_supervisor = asyncio.create_task(fetcher.run_browser_supervisor())
+    await extraction_pool.initialize()
     await summarizer.initialize()
 
     yield
 
     await summarizer.close()
+    await reextract_jobs.close()
+    await extraction_pool.close()
+    browser_supervisor.cancel()
     await fetcher.close()
     await searxng_client.close()
+    maintenance.cancel()
     await cache.close()
 
 
@@ -45,6 +55,7 @@ app.add_middleware(
 app.include_router(search_router)
 app.include_router(fetch_router)
 app.include_router(health_router)
+app.include_router(snapshots_router)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
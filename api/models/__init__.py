@@ -1,21 +1,33 @@
 from .schemas import (
     SearchRequest,
+    Passage,
     SearchResult,
     SearchResponse,
     FetchRequest,
     FetchResponse,
+    BatchFetchRequest,
+    BatchFetchItem,
+    BatchFetchResponse,
     DiffRequest,
     DiffResponse,
+    ReextractRequest,
+    ReextractJob,
     HealthResponse,
 )
 
 __all__ = [
     "SearchRequest",
+    "Passage",
     "SearchResult",
     "SearchResponse",
     "FetchRequest",
     "FetchResponse",
+    "BatchFetchRequest",
+    "BatchFetchItem",
+    "BatchFetchResponse",
     "DiffRequest",
     "DiffResponse",
+    "ReextractRequest",
+    "ReextractJob",
     "HealthResponse",
 ]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 
 class SearchRequest(BaseModel):
@@ -9,6 +9,23 @@ class SearchRequest(BaseModel):
     summarize: bool = Field(default=False)
     bypass_cache: bool = Field(default=False)
     engines: list[str] | None = Field(default=None)
+    stream: bool = Field(default=False)
+    timeout_ms: int | None = Field(default=None, ge=100, le=600000)
+    # Return the top passages matching the query instead of the full markdown
+    passages: int | None = Field(default=None, ge=1, le=50)
+    passages_max_chars: int = Field(default=4000, ge=200, le=200000)
+    passages_across_results: bool = Field(default=False)
+
+    @model_validator(mode="after")
+    def _passages_need_extract(self) -> "SearchRequest":
+        if self.passages and not self.extract:
+            raise ValueError("passages requires extract")
+        return self
+
+
+class Passage(BaseModel):
+    text: str
+    score: float
 
 
 class SearchResult(BaseModel):
@@ -16,10 +33,18 @@ class SearchResult(BaseModel):
     title: str
     snippet: str
     markdown: str | None = None
+    passages: list[Passage] | None = None
     summary: str | None = None
+    summary_from_cache: bool = False
+    summary_input_ratio: float | None = None  # share of the content sent to the model
     fetched_at: datetime | None = None
     from_cache: bool = False
+    stale: bool = False
+    truncated: bool = False
     engine: str | None = None
+    # "ok", "error" (page could not be fetched), "timeout" (cut off by
+    # timeout_ms) or "pending" (not processed yet, only in streamed hits)
+    status: str = "pending"
 
 
 class SearchResponse(BaseModel):
@@ -29,6 +54,7 @@ class SearchResponse(BaseModel):
     extract_time_ms: int | None = None
     summarize_time_ms: int | None = None
     total_results: int
+    partial: bool = False
 
 
 class FetchRequest(BaseModel):
@@ -36,6 +62,8 @@ class FetchRequest(BaseModel):
     force_js: bool = Field(default=False)
     summarize: bool = Field(default=False)
     bypass_cache: bool = Field(default=False)
+    stream: bool = Field(default=False)
+    timeout_ms: int | None = Field(default=None, ge=100, le=600000)
 
 
 class FetchResponse(BaseModel):
@@ -43,10 +71,38 @@ class FetchResponse(BaseModel):
     canonical_url: str
     markdown: str
     summary: str | None = None
+    summary_from_cache: bool = False
+    summary_input_ratio: float | None = None  # share of the content sent to the model
     fetched_at: datetime
     from_cache: bool = False
     content_hash: str
     changed_since_last: bool | None = None
+    stale: bool = False
+    truncated: bool = False
+    summary_timed_out: bool = False  # timeout_ms ran out; the summary is cached when done
+
+
+class BatchFetchRequest(BaseModel):
+    urls: list[str] = Field(..., min_length=1)
+    force_js: bool = Field(default=False)
+    summarize: bool = Field(default=False)
+    bypass_cache: bool = Field(default=False)
+    stream: bool = Field(default=False)
+
+
+class BatchFetchItem(BaseModel):
+    url: str
+    status: str  # "ok" or "error"
+    status_code: int = 200
+    error: str | None = None
+    result: FetchResponse | None = None
+
+
+class BatchFetchResponse(BaseModel):
+    results: list[BatchFetchItem]
+    succeeded: int
+    failed: int
+    total_time_ms: int
 
 
 class DiffRequest(BaseModel):
@@ -60,6 +116,25 @@ class DiffResponse(BaseModel):
     previous_hash: str | None = None
     current_hash: str
     last_checked: datetime
+    not_modified: bool = False
+
+
+class ReextractRequest(BaseModel):
+    urls: list[str] | None = Field(default=None)  # None re-extracts every snapshot
+
+
+class ReextractJob(BaseModel):
+    job_id: str
+    status: str  # "running", "done", "failed" or "cancelled"
+    total: int | None = None
+    done: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    failed: int = 0
+    created_at: datetime
+    finished_at: datetime | None = None
+    error: str | None = None
 
 
 class HealthResponse(BaseModel):
@@ -67,4 +142,20 @@ class HealthResponse(BaseModel):
     searxng: bool
     ollama: bool
     playwright_contexts: int
+    playwright_in_use: int | None = None
+    playwright_idle: int | None = None
+    playwright_avg_wait_ms: int | None = None
+    browser_state: str | None = None
+    browser_rss_bytes: int | None = None
+    browser_crashes: int | None = None
+    browser_recycles: int | None = None
+    browser_error: str | None = None
     cache_entries: int | None = None
+    cache_bytes_on_disk: int | None = None
+    cache_evictions: int | None = None
+    fetch_connections: int | None = None
+    fetch_idle_connections: int | None = None
+    fetch_http2_connections: int | None = None
+    dns_cache_hits: int | None = None
+    ollama_active: int | None = None
+    ollama_queued: int | None = None
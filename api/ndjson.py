@@ -0,0 +1,6 @@
+import json
+
+
+def ndjson_event(event: str, **data) -> str:
+    """One line of a streamed NDJSON response."""
+    return json.dumps({"event": event, **data}) + "\n"
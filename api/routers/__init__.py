@@ -1,5 +1,6 @@
 from .search import router as search_router
 from .fetch import router as fetch_router
 from .health import router as health_router
+from .snapshots import router as snapshots_router
 
-__all__ = ["search_router", "fetch_router", "health_router"]
+__all__ = ["search_router", "fetch_router", "health_router", "snapshots_router"]
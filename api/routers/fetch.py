@@ -1,68 +1,304 @@
+import asyncio
 import time
 from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from cache import cache
-from models.schemas import FetchRequest, FetchResponse, DiffRequest, DiffResponse
-from services.fetcher import fetcher
-from services.extractor import extract_content
-from services.summarizer import summarizer
+from config import settings
+from deadline import deadline_after, remaining, detach
+from disconnect import until_disconnected
+from ndjson import ndjson_event
+from models.schemas import (
+    FetchRequest,
+    FetchResponse,
+    BatchFetchRequest,
+    BatchFetchItem,
+    BatchFetchResponse,
+    DiffRequest,
+    DiffResponse,
+)
+from services.content import fetch_and_extract, refresh_in_background
+from services.summarizer import summarizer, INTERACTIVE, BULK
 
 router = APIRouter(prefix="/api", tags=["fetch"])
 
 
 @router.post("/fetch", response_model=FetchResponse)
-async def fetch_url(request: FetchRequest) -> FetchResponse:
+async def fetch_url(
+    request: FetchRequest, http_request: Request
+) -> FetchResponse | StreamingResponse:
+    if request.stream:
+        return StreamingResponse(
+            _fetch_stream(request),
+            media_type="application/x-ndjson",
+        )
+
+    deadline = deadline_after(request.timeout_ms)
     previous_hash = await cache.get_content_hash(request.url)
 
+    cached = None
     if not request.bypass_cache:
-        cached = await cache.get_content(request.url)
-        if cached:
-            response = FetchResponse(
-                url=request.url,
-                canonical_url=cached["canonical_url"],
-                markdown=cached["markdown"],
-                fetched_at=datetime.fromtimestamp(
-                    cached["fetched_at"], tz=timezone.utc
-                ),
-                from_cache=True,
-                content_hash=cached["content_hash"],
-                changed_since_last=None,
-            )
+        cached = await cache.get_content(request.url, allow_stale=True)
+
+    return await until_disconnected(
+        http_request, _fetch(request, cached, previous_hash, INTERACTIVE, deadline)
+    )
+
+
+async def _fetch(
+    request: FetchRequest,
+    cached: dict | None,
+    previous_hash: str | None,
+    priority: int = BULK,
+    deadline: float | None = None,
+) -> FetchResponse:
+    response = await _fetch_content(request, cached, previous_hash, deadline)
+    if request.summarize:
+        await _summarize(response, priority, deadline)
+    return response
+
+
+async def _summarize(
+    response: FetchResponse,
+    priority: int,
+    deadline: float | None,
+    on_delta: Callable[[str], None] | None = None,
+) -> None:
+    """Fill in the summary, or set summary_timed_out at the deadline.
+
+    A summary cut off by the deadline is still finished and cached in the
+    background.
+    """
+    task = asyncio.create_task(summarizer.summarize_cached(
+        response.markdown,
+        content_hash=response.content_hash,
+        priority=priority,
+        on_delta=on_delta,
+    ))
+    try:
+        done, _ = await asyncio.wait({task}, timeout=remaining(deadline))
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    if not done:
+        detach(task)
+        response.summary_timed_out = True
+        return
+
+    result = task.result()
+    response.summary = result.summary
+    response.summary_from_cache = result.from_cache
+    response.summary_input_ratio = result.input_ratio
+
 
-            if request.summarize:
-                response.summary = await summarizer.summarize(cached["markdown"])
+async def _fetch_content(
+    request: FetchRequest,
+    cached: dict | None,
+    previous_hash: str | None,
+    deadline: float | None = None,
+) -> FetchResponse:
+    if cached:
+        if cached["stale"]:
+            refresh_in_background(request.url)
 
-            return response
+        return FetchResponse(
+            url=request.url,
+            canonical_url=cached["canonical_url"],
+            markdown=cached["markdown"],
+            fetched_at=datetime.fromtimestamp(
+                cached["fetched_at"], tz=timezone.utc
+            ),
+            from_cache=True,
+            content_hash=cached["content_hash"],
+            changed_since_last=None,
+            stale=cached["stale"],
+            truncated=cached["truncated"],
+        )
 
-    html, canonical_url = await fetcher.fetch(request.url, force_js=request.force_js)
+    try:
+        # The fetch itself is shared and runs on past the deadline, so the
+        # page is cached for the next request.
+        fetched = await asyncio.wait_for(
+            fetch_and_extract(request.url, force_js=request.force_js),
+            timeout=remaining(deadline),
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="Fetch did not finish within timeout_ms; it continues in the background",
+        )
 
-    if not html:
+    if not fetched:
         raise HTTPException(status_code=502, detail="Failed to fetch URL")
 
-    markdown = extract_content(html, request.url)
+    if fetched.get("unsupported_type"):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type: {fetched['unsupported_type']}",
+        )
+
+    markdown = fetched["markdown"]
     if not markdown:
         raise HTTPException(status_code=422, detail="Failed to extract content")
 
-    content_hash = cache.hash_content(markdown)
-    now = datetime.now(timezone.utc)
-
-    await cache.set_content(request.url, canonical_url, markdown)
-
-    summary = None
-    if request.summarize:
-        summary = await summarizer.summarize(markdown)
+    content_hash = fetched["content_hash"]
 
     return FetchResponse(
         url=request.url,
-        canonical_url=canonical_url,
+        canonical_url=fetched["canonical_url"],
         markdown=markdown,
-        summary=summary,
-        fetched_at=now,
+        fetched_at=datetime.fromtimestamp(fetched["fetched_at"], tz=timezone.utc),
         from_cache=False,
         content_hash=content_hash,
         changed_since_last=previous_hash is not None and previous_hash != content_hash,
+        truncated=fetched["truncated"],
+    )
+
+
+async def _fetch_stream(request: FetchRequest) -> AsyncIterator[str]:
+    """Emit the page as a "content" event, then the summary as it is generated.
+
+    Summary text arrives in "summary_delta" events; "done" carries the full
+    summary. Failures are reported as an "error" event with a status_code.
+    """
+    deadline = deadline_after(request.timeout_ms)
+    previous_hash = await cache.get_content_hash(request.url)
+
+    cached = None
+    if not request.bypass_cache:
+        cached = await cache.get_content(request.url, allow_stale=True)
+
+    try:
+        response = await _fetch_content(request, cached, previous_hash, deadline)
+    except HTTPException as e:
+        yield ndjson_event("error", status_code=e.status_code, detail=e.detail)
+        return
+
+    yield ndjson_event("content", result=response.model_dump(mode="json"))
+
+    if request.summarize:
+        events: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def summarize() -> None:
+            try:
+                await _summarize(
+                    response,
+                    INTERACTIVE,
+                    deadline,
+                    lambda text: events.put_nowait(
+                        ndjson_event("summary_delta", text=text)
+                    ),
+                )
+            finally:
+                events.put_nowait(None)
+
+        runner = asyncio.create_task(summarize())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await runner
+        finally:
+            # Client went away: the generation is cancelled unless shared.
+            runner.cancel()
+
+    yield ndjson_event(
+        "done",
+        summary=response.summary,
+        summary_from_cache=response.summary_from_cache,
+        summary_input_ratio=response.summary_input_ratio,
+        summary_timed_out=response.summary_timed_out,
+    )
+
+
+@router.post("/fetch/batch", response_model=BatchFetchResponse)
+async def fetch_batch(request: BatchFetchRequest) -> BatchFetchResponse | StreamingResponse:
+    if len(request.urls) > settings.fetch_batch_max_urls:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.fetch_batch_max_urls} URLs per batch",
+        )
+
+    if request.stream:
+        return StreamingResponse(
+            _batch_stream(request),
+            media_type="application/x-ndjson",
+        )
+
+    start_time = time.time()
+    results: list[BatchFetchItem | None] = [None] * len(request.urls)
+    async for index, item in _batch_items(request):
+        results[index] = item
+
+    succeeded = sum(1 for item in results if item.status == "ok")
+    return BatchFetchResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        total_time_ms=int((time.time() - start_time) * 1000),
+    )
+
+
+async def _batch_items(request: BatchFetchRequest) -> AsyncIterator[tuple[int, BatchFetchItem]]:
+    """Yield (index, item) pairs in completion order.
+
+    Cache hits for the whole batch are looked up in one query; misses are
+    fetched with at most fetch_batch_concurrency in flight. A failing URL
+    becomes an error item instead of failing the batch.
+    """
+    cached = {}
+    if not request.bypass_cache:
+        cached = await cache.get_content_many(request.urls, allow_stale=True)
+
+    semaphore = asyncio.Semaphore(settings.fetch_batch_concurrency)
+
+    async def run(index: int, url: str) -> tuple[int, BatchFetchItem]:
+        single = FetchRequest(
+            url=url,
+            force_js=request.force_js,
+            summarize=request.summarize,
+            bypass_cache=request.bypass_cache,
+        )
+        try:
+            async with semaphore:
+                entry = cached.get(url)
+                previous_hash = None if entry else await cache.get_content_hash(url)
+                response = await _fetch(single, entry, previous_hash)
+            item = BatchFetchItem(url=url, status="ok", result=response)
+        except HTTPException as e:
+            item = BatchFetchItem(
+                url=url, status="error", status_code=e.status_code, error=e.detail
+            )
+        except Exception as e:
+            item = BatchFetchItem(url=url, status="error", status_code=500, error=str(e))
+        return index, item
+
+    tasks = [asyncio.create_task(run(i, url)) for i, url in enumerate(request.urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: drop queued URLs; shared fetches keep running.
+        for task in tasks:
+            task.cancel()
+
+
+async def _batch_stream(request: BatchFetchRequest) -> AsyncIterator[str]:
+    """Emit a "result" event per URL as it completes, then a "done" event."""
+    start_time = time.time()
+    succeeded = 0
+    async for index, item in _batch_items(request):
+        succeeded += item.status == "ok"
+        yield ndjson_event("result", index=index, item=item.model_dump(mode="json"))
+
+    yield ndjson_event(
+        "done",
+        succeeded=succeeded,
+        failed=len(request.urls) - succeeded,
+        total_time_ms=int((time.time() - start_time) * 1000),
     )
 
 
@@ -70,21 +306,19 @@ async def fetch_url(request: FetchRequest) -> FetchResponse:
 async def check_diff(request: DiffRequest) -> DiffResponse:
     previous_hash = await cache.get_content_hash(request.url)
 
-    html, canonical_url = await fetcher.fetch(request.url)
+    fetched = await fetch_and_extract(request.url)
 
-    if not html:
+    if not fetched:
         raise HTTPException(status_code=502, detail="Failed to fetch URL")
 
-    markdown = extract_content(html, request.url)
-    current_hash = cache.hash_content(markdown)
+    current_hash = fetched["content_hash"]
     now = datetime.now(timezone.utc)
 
-    await cache.set_content(request.url, canonical_url, markdown)
-
     return DiffResponse(
         url=request.url,
         changed=previous_hash is not None and previous_hash != current_hash,
         previous_hash=previous_hash,
         current_hash=current_hash,
         last_checked=now,
+        not_modified=fetched["not_modified"],
     )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 import httpx
 
+from cache import cache
 from config import settings
 from models.schemas import HealthResponse
 from services.summarizer import summarizer
@@ -23,9 +24,37 @@ async def health_check() -> HealthResponse:
 
     playwright_contexts = settings.playwright_max_contexts
 
+    cache_stats = {}
+    try:
+        cache_stats = await cache.stats()
+    except Exception:
+        pass
+
+    ollama_stats = summarizer.stats()
+    pool_stats = fetcher.stats()
+    dns_stats = pool_stats["dns"] or {}
+    browser_stats = pool_stats["playwright"]
+
     return HealthResponse(
         status="healthy" if searxng_ok else "degraded",
         searxng=searxng_ok,
         ollama=ollama_ok,
         playwright_contexts=playwright_contexts,
+        playwright_in_use=browser_stats["in_use"],
+        playwright_idle=browser_stats["idle"],
+        playwright_avg_wait_ms=browser_stats["avg_wait_ms"],
+        browser_state=browser_stats["state"],
+        browser_rss_bytes=browser_stats["rss_bytes"],
+        browser_crashes=browser_stats["crashes"],
+        browser_recycles=browser_stats["recycles"],
+        browser_error=browser_stats["last_error"],
+        cache_entries=cache_stats.get("entries"),
+        cache_bytes_on_disk=cache_stats.get("bytes_on_disk"),
+        cache_evictions=cache_stats.get("evictions"),
+        fetch_connections=pool_stats["connections"],
+        fetch_idle_connections=pool_stats["idle_connections"],
+        fetch_http2_connections=pool_stats["http2_connections"],
+        dns_cache_hits=dns_stats.get("hits"),
+        ollama_active=ollama_stats["active"],
+        ollama_queued=ollama_stats["queued"],
     )
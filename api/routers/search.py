@@ -1,107 +1,387 @@
 import asyncio
 import time
 from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from cache import cache
-from models.schemas import SearchRequest, SearchResult, SearchResponse
+from config import settings
+from deadline import deadline_after, remaining, detach
+from disconnect import until_disconnected
+from ndjson import ndjson_event
+from models.schemas import SearchRequest, Passage, SearchResult, SearchResponse
+from urls import normalize_url
 from services.searxng import searxng_client
-from services.fetcher import fetcher
-from services.extractor import extract_content
-from services.summarizer import summarizer
+from services.content import fetch_and_extract, refresh_in_background
+from services.dedup import singleflight, normalize_query
+from services.passages import top_passages
+from services.summarizer import summarizer, BULK
 
 router = APIRouter(prefix="/api", tags=["search"])
 
 
+def _search_key(request: SearchRequest) -> str:
+    return ":".join([
+        "search",
+        normalize_query(request.query),
+        ",".join(sorted(request.engines or [])),
+        str(request.max_results),
+        str(request.extract),
+        str(request.summarize),
+        str(request.bypass_cache),
+        str(request.timeout_ms),
+        str(request.passages),
+        str(request.passages_max_chars),
+        str(request.passages_across_results),
+    ])
+
+
+def _hits_key(request: SearchRequest) -> str:
+    return f"hits:{normalize_query(request.query)}:{','.join(sorted(request.engines or []))}"
+
+
 @router.post("/search", response_model=SearchResponse)
-async def search(request: SearchRequest) -> SearchResponse:
-    start_time = time.time()
+async def search(
+    request: SearchRequest, http_request: Request
+) -> SearchResponse | StreamingResponse:
+    if request.stream:
+        return StreamingResponse(
+            _search_stream(request),
+            media_type="application/x-ndjson",
+        )
+    return await until_disconnected(
+        http_request,
+        singleflight.do(
+            _search_key(request),
+            lambda: _search(request),
+            cancel_when_abandoned=True,
+        ),
+    )
+
+
+async def _fetch_hits(request: SearchRequest, max_results: int | None = None) -> list[dict]:
+    """Search until max_results hits are found and cache them.
+
+    The hit list is cached per query, so later requests with a larger
+    max_results reuse it, or any max_results once SearXNG has no more
+    pages. When it is shorter than searxng_min_results, the following pages
+    are fetched in the background to top it up.
+    """
+    gathered = await searxng_client.gather_hits(
+        query=request.query,
+        max_results=max_results,
+        engines=request.engines,
+    )
+    hits = gathered.hits
+    await cache.set_search(
+        request.query,
+        hits,
+        request.engines,
+        ttl=None if gathered.complete else settings.cache_ttl_search_partial,
+        exhausted=gathered.complete and gathered.next_page is None,
+    )
+    if (
+        gathered.complete
+        and gathered.next_page
+        and len(hits) < settings.searxng_min_results
+    ):
+        singleflight.start(
+            f"more:{_hits_key(request)}",
+            lambda: _fetch_more_hits(request, hits, gathered.next_page),
+        )
+    return hits
+
+
+async def _fetch_more_hits(
+    request: SearchRequest, hits: list[dict], first_page: int
+) -> list[dict]:
+    gathered = await searxng_client.gather_hits(
+        query=request.query,
+        max_results=settings.searxng_min_results - len(hits),
+        engines=request.engines,
+        first_page=first_page,
+    )
+    seen = {normalize_url(hit["url"]) for hit in hits}
+    hits = hits + [hit for hit in gathered.hits if normalize_url(hit["url"]) not in seen]
+    await cache.set_search(
+        request.query,
+        hits,
+        request.engines,
+        ttl=None if gathered.complete else settings.cache_ttl_search_partial,
+        exhausted=gathered.complete and gathered.next_page is None,
+    )
+    return hits
+
 
+async def _get_hits(request: SearchRequest) -> list[dict]:
     if not request.bypass_cache:
-        cached_results = await cache.get_search(request.query, request.engines)
-        if cached_results:
-            search_time_ms = int((time.time() - start_time) * 1000)
-            results = [SearchResult(**r) for r in cached_results]
-            return SearchResponse(
-                query=request.query,
-                results=results,
-                search_time_ms=search_time_ms,
-                total_results=len(results),
-            )
+        cached = await cache.get_search(request.query, request.engines, allow_stale=True)
+        # A shorter list cached for a smaller max_results is searched again,
+        # unless it already holds every hit the query has.
+        if cached is not None and (
+            cached["exhausted"] or len(cached["hits"]) >= request.max_results
+        ):
+            hits = cached["hits"]
+            if any(hit.get("stale") for hit in hits):
+                singleflight.start(
+                    f"refresh:{_hits_key(request)}",
+                    lambda: _fetch_hits(request),
+                )
+            return hits
+
+    return await singleflight.do(
+        f"{_hits_key(request)}:{request.max_results}",
+        lambda: _fetch_hits(request, request.max_results),
+    )
+
 
+async def _get_hits_by(request: SearchRequest, deadline: float | None) -> list[dict] | None:
+    """Hits, or None if the deadline passed first; the search itself is
+    shared, so it runs on and its hits are cached."""
     try:
-        search_results = await searxng_client.search(
-            query=request.query,
-            max_results=request.max_results,
-            engines=request.engines,
-        )
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Search failed: {str(e)}")
+        return await asyncio.wait_for(_get_hits(request), timeout=remaining(deadline))
+    except asyncio.TimeoutError:
+        return None
 
-    search_time_ms = int((time.time() - start_time) * 1000)
 
+def _build_results(hits: list[dict], request: SearchRequest) -> list[SearchResult]:
     results: list[SearchResult] = []
-    for item in search_results:
+    for item in hits[:request.max_results]:
         results.append(SearchResult(
             url=item["url"],
             title=item["title"],
             snippet=item["snippet"],
             engine=item.get("engine"),
+            stale=item.get("stale", False),
         ))
+    return results
+
 
-    extract_time_ms = None
-    summarize_time_ms = None
+async def _add_content(result: SearchResult, request: SearchRequest) -> SearchResult:
+    cached = await cache.get_content(result.url, allow_stale=True)
+    if cached and not request.bypass_cache:
+        result.markdown = cached["markdown"]
+        result.fetched_at = datetime.fromtimestamp(
+            cached["fetched_at"], tz=timezone.utc
+        )
+        result.from_cache = True
+        result.stale = result.stale or cached["stale"]
+        result.truncated = cached["truncated"]
+        if cached["stale"]:
+            refresh_in_background(result.url)
+        return result
 
-    if request.extract and results:
-        extract_start = time.time()
+    fetched = await fetch_and_extract(result.url)
+    if fetched:
+        result.markdown = fetched["markdown"]
+        result.fetched_at = datetime.fromtimestamp(
+            fetched["fetched_at"], tz=timezone.utc
+        )
+        result.truncated = fetched["truncated"]
+    return result
 
-        async def fetch_and_extract(result: SearchResult) -> SearchResult:
-            cached = await cache.get_content(result.url)
-            if cached and not request.bypass_cache:
-                result.markdown = cached["markdown"]
-                result.fetched_at = datetime.fromtimestamp(
-                    cached["fetched_at"], tz=timezone.utc
-                )
-                result.from_cache = True
-                return result
-
-            html, canonical_url = await fetcher.fetch(result.url)
-            if html:
-                markdown = extract_content(html, result.url)
-                result.markdown = markdown
-                result.fetched_at = datetime.now(timezone.utc)
-
-                await cache.set_content(result.url, canonical_url, markdown)
-            return result
-
-        results = await asyncio.gather(*[fetch_and_extract(r) for r in results])
-        results = list(results)
-        extract_time_ms = int((time.time() - extract_start) * 1000)
-
-    if request.summarize and results:
-        summarize_start = time.time()
-
-        async def add_summary(result: SearchResult) -> SearchResult:
-            if result.markdown:
-                result.summary = await summarizer.summarize(
-                    result.markdown,
-                    focus=request.query
-                )
-            return result
 
-        results = await asyncio.gather(*[add_summary(r) for r in results])
-        results = list(results)
-        summarize_time_ms = int((time.time() - summarize_start) * 1000)
+async def _add_summary(
+    result: SearchResult,
+    request: SearchRequest,
+    on_delta: Callable[[str], None] | None = None
+) -> SearchResult:
+    if result.markdown:
+        summary = await summarizer.summarize_cached(
+            result.markdown,
+            focus=request.query,
+            priority=BULK,
+            on_delta=on_delta,
+        )
+        result.summary = summary.summary
+        result.summary_from_cache = summary.from_cache
+        result.summary_input_ratio = summary.input_ratio
+    return result
+
+
+async def _process_results(
+    request: SearchRequest,
+    results: list[SearchResult],
+    deadline: float | None,
+    on_event: Callable[[str], None] | None = None,
+) -> dict:
+    """Fetch and summarize every result, each as soon as its page lands.
+
+    Results not finished by the deadline get status "timeout" and are
+    replaced in results by a copy, so late work cannot change the response.
+    Their fetches run on and are cached; a summary already underway is
+    finished and cached in the background, summaries not yet started are
+    dropped. Returns the extract and summarize timings and the indices of
+    the results that timed out.
+    """
+    stage_start = time.time()
+    timings = {"extract": None, "summarize": None, "timed_out": []}
+    summarizing: set[int] = set()
+
+    def emit(event: str, **data) -> None:
+        if on_event:
+            on_event(ndjson_event(event, **data))
+
+    async def process(index: int, result: SearchResult) -> None:
+        if request.extract:
+            await _add_content(result, request)
+            timings["extract"] = int((time.time() - stage_start) * 1000)
+            result.status = "ok" if result.markdown else "error"
+            # In passage mode the markdown stays server-side.
+            emit("result", index=index, result=result.model_dump(
+                mode="json", exclude={"markdown"} if request.passages else None
+            ))
+        if request.summarize and result.markdown:
+            summarizing.add(index)
+            await _add_summary(
+                result,
+                request,
+                # Without a listener the summary is not streamed at all.
+                (lambda text: emit("summary_delta", index=index, text=text))
+                if on_event else None,
+            )
+            timings["summarize"] = int((time.time() - stage_start) * 1000)
+            emit(
+                "summary",
+                index=index,
+                summary=result.summary,
+                summary_from_cache=result.summary_from_cache,
+                summary_input_ratio=result.summary_input_ratio,
+            )
+        if result.status == "pending":
+            result.status = "ok"
+
+    tasks = [asyncio.create_task(process(i, r)) for i, r in enumerate(results)]
+    if not tasks:
+        return timings
+
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=remaining(deadline))
+    except asyncio.CancelledError:
+        # Client went away: stop waiting; shared fetches keep running,
+        # summaries nobody else is waiting for are cancelled.
+        for task in tasks:
+            task.cancel()
+        raise
+
+    for task in pending:
+        index = tasks.index(task)
+        results[index] = results[index].model_copy(update={"status": "timeout"})
+        timings["timed_out"].append(index)
+        if index in summarizing:
+            detach(task)
+        else:
+            task.cancel()
+    timings["timed_out"].sort()
+    return timings
+
+
+async def _add_passages(request: SearchRequest, results: list[SearchResult]) -> None:
+    """Replace each result's markdown with its passages that best match the query."""
+    selected = await asyncio.to_thread(
+        top_passages,
+        [result.markdown or "" for result in results],
+        request.query,
+        request.passages,
+        request.passages_max_chars,
+        request.passages_across_results,
+    )
+    for result, passages in zip(results, selected):
+        if result.markdown is not None:
+            result.passages = [Passage(text=text, score=score) for text, score in passages]
+            result.markdown = None
+
 
-    results_dicts = [r.model_dump(mode="json") for r in results]
-    await cache.set_search(request.query, results_dicts, request.engines)
+async def _search(request: SearchRequest) -> SearchResponse:
+    start_time = time.time()
+    deadline = deadline_after(request.timeout_ms)
+
+    try:
+        hits = await _get_hits_by(request, deadline)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Search failed: {str(e)}")
+
+    search_time_ms = int((time.time() - start_time) * 1000)
+
+    results = _build_results(hits or [], request)
+    timings = await _process_results(request, results, deadline)
+    if request.passages:
+        await _add_passages(request, results)
 
     return SearchResponse(
         query=request.query,
         results=results,
         search_time_ms=search_time_ms,
-        extract_time_ms=extract_time_ms,
-        summarize_time_ms=summarize_time_ms,
+        extract_time_ms=timings["extract"],
+        summarize_time_ms=timings["summarize"],
+        total_results=len(results),
+        partial=hits is None or bool(timings["timed_out"]),
+    )
+
+
+async def _search_stream(request: SearchRequest) -> AsyncIterator[str]:
+    """Emit the hit list, then each result as its markdown and summary land.
+
+    Events are newline-delimited JSON objects: "hits", "result",
+    "summary_delta" with summary text as it is generated, "summary", in
+    passage mode one "passages" event with every result's passages, and a
+    final "done" with timings and the indices of results cut off by
+    timeout_ms, or "error" if the search itself fails.
+    """
+    start_time = time.time()
+    deadline = deadline_after(request.timeout_ms)
+
+    try:
+        hits = await _get_hits_by(request, deadline)
+    except Exception as e:
+        yield ndjson_event("error", detail=f"Search failed: {str(e)}")
+        return
+
+    search_time_ms = int((time.time() - start_time) * 1000)
+    results = _build_results(hits or [], request)
+
+    yield ndjson_event(
+        "hits",
+        query=request.query,
+        results=[r.model_dump(mode="json") for r in results],
+        search_time_ms=search_time_ms,
+    )
+
+    events: asyncio.Queue[str | None] = asyncio.Queue()
+    timings = {}
+
+    async def run_all() -> None:
+        try:
+            timings.update(await _process_results(
+                request, results, deadline, events.put_nowait
+            ))
+        finally:
+            events.put_nowait(None)
+
+    runner = asyncio.create_task(run_all())
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        await runner
+    finally:
+        runner.cancel()
+
+    if request.passages:
+        await _add_passages(request, results)
+        yield ndjson_event("passages", results=[
+            [p.model_dump() for p in result.passages] if result.passages is not None else None
+            for result in results
+        ])
+
+    yield ndjson_event(
+        "done",
+        search_time_ms=search_time_ms,
+        extract_time_ms=timings["extract"],
+        summarize_time_ms=timings["summarize"],
         total_results=len(results),
+        total_time_ms=int((time.time() - start_time) * 1000),
+        partial=hits is None or bool(timings["timed_out"]),
+        timed_out=timings["timed_out"],
     )
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+
+from models.schemas import ReextractRequest, ReextractJob
+from services.reextract import reextract_jobs
+
+router = APIRouter(prefix="/api/snapshots", tags=["snapshots"])
+
+
+@router.post("/reextract", response_model=ReextractJob, status_code=202)
+async def start_reextract(request: ReextractRequest) -> ReextractJob:
+    return ReextractJob(**reextract_jobs.start(request.urls))
+
+
+@router.get("/jobs/{job_id}", response_model=ReextractJob)
+async def get_reextract_job(job_id: str) -> ReextractJob:
+    job = reextract_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ReextractJob(**job)
@@ -1,6 +1,20 @@
 from .searxng import searxng_client
 from .fetcher import fetcher
-from .extractor import extract_content
+from .extractor import extract_content, extraction_pool
 from .summarizer import summarizer
+from .dedup import singleflight
+from .render_profiles import render_profiles
+from .content import fetch_and_extract
+from .reextract import reextract_jobs
 
-__all__ = ["searxng_client", "fetcher", "extract_content", "summarizer"]
+__all__ = [
+    "searxng_client",
+    "fetcher",
+    "extract_content",
+    "extraction_pool",
+    "summarizer",
+    "singleflight",
+    "render_profiles",
+    "fetch_and_extract",
+    "reextract_jobs",
+]
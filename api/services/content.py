@@ -0,0 +1,119 @@
+import time
+
+from cache import cache
+from config import settings
+from urls import normalize_url
+from .dedup import singleflight
+from .fetcher import fetcher
+from .extractor import extraction_pool
+from .render_profiles import render_profiles
+
+
+def content_ttl(max_age: int | None) -> int:
+    if max_age is None:
+        return settings.cache_ttl_content
+    return min(max_age, settings.cache_ttl_content)
+
+
+def _content_key(url: str, force_js: bool) -> str:
+    return f"content:{normalize_url(url)}:{force_js}"
+
+
+async def fetch_and_extract(url: str, force_js: bool = False) -> dict | None:
+    return await singleflight.do(
+        _content_key(url, force_js),
+        lambda: _fetch_and_extract(url, force_js),
+    )
+
+
+def refresh_in_background(url: str) -> None:
+    singleflight.start(
+        _content_key(url, False),
+        lambda: _fetch_and_extract(url, False),
+    )
+
+
+async def _fetch_and_extract(url: str, force_js: bool) -> dict | None:
+    validators = None if force_js else await cache.get_validators(url)
+    prefer_js = not force_js and await render_profiles.prefer_js(url)
+    result = await fetcher.fetch(
+        url, force_js=force_js, validators=validators, prefer_js=prefer_js
+    )
+
+    if result.not_modified:
+        ttl = content_ttl(result.max_age)
+        if await cache.refresh_content(url, ttl, result.etag, result.last_modified):
+            # no-cache pages get a zero TTL, so the row is already expired.
+            cached = await cache.get_content(url, ignore_expiry=True)
+            if cached:
+                cached["from_cache"] = False
+                cached["not_modified"] = True
+                cached["stale"] = False
+                return cached
+        # The entry vanished between lookup and refresh; fetch it in full.
+        result = await fetcher.fetch(url)
+
+    if result.unsupported:
+        return {
+            "canonical_url": result.canonical_url,
+            "markdown": "",
+            "content_hash": cache.hash_content(""),
+            "fetched_at": time.time(),
+            "from_cache": False,
+            "not_modified": False,
+            "truncated": False,
+            "unsupported_type": result.content_type,
+        }
+
+    if result.text is not None:
+        markdown = result.text.strip()
+        truncated = result.truncated
+    elif result.html:
+        markdown, extractor = await extraction_pool.extract(
+            result.html, url, hint=await render_profiles.extractor_hint(url)
+        )
+        truncated = result.truncated or len(result.html) > settings.extract_max_html_chars
+        if settings.cache_snapshots:
+            await cache.set_snapshot(
+                url,
+                result.canonical_url,
+                result.html[:settings.extract_max_html_chars],
+                rendered=result.rendered,
+            )
+        if markdown is None:
+            # Extraction timed out, which says nothing about the fetch path.
+            markdown = ""
+        else:
+            await render_profiles.record(
+                url,
+                result.attempts,
+                "js" if result.rendered else "fast",
+                len(markdown),
+                extractor=extractor,
+            )
+    else:
+        if not result.throttled:
+            await render_profiles.record(url, result.attempts, None, 0)
+        return None
+
+    if markdown:
+        await cache.set_content(
+            url,
+            result.canonical_url,
+            markdown,
+            ttl=content_ttl(result.max_age),
+            etag=result.etag,
+            last_modified=result.last_modified,
+            truncated=truncated,
+        )
+
+    return {
+        "canonical_url": result.canonical_url,
+        "markdown": markdown,
+        "content_hash": cache.hash_content(markdown),
+        "fetched_at": time.time(),
+        "from_cache": False,
+        "not_modified": False,
+        "truncated": truncated,
+        "unsupported_type": None,
+    }
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one in-flight task.
+
+    The shared work runs as its own task, so a caller that disconnects does
+    not cancel it for the others (and its result still reaches the cache).
+    """
+
+    def __init__(self):
+        self._pending: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        cancel_when_abandoned: bool = False
+    ) -> Any:
+        """Wait for the shared task under key, starting it if needed.
+
+        With cancel_when_abandoned the task is cancelled once every caller
+        waiting on it has been cancelled, e.g. because its client went away.
+        """
+        task = self.start(key, fn)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if cancel_when_abandoned and self._waiters[task] == 1 and not task.done():
+                # Later callers must not join a task that is being cancelled.
+                if self._pending.get(key) is task:
+                    del self._pending[key]
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # Mark the exception as retrieved if every waiter went away.
+        if not task.cancelled():
+            task.exception()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+singleflight = SingleFlight()
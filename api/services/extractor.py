@@ -1,9 +1,26 @@
+import asyncio
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import trafilatura
+from trafilatura.utils import load_html
 from readability import Document
 import html2text
+from lxml.html import HtmlElement, tostring
+
+from config import settings
+
+EXTRACTORS = ("trafilatura", "readability", "html2text")
 
+# Text nodes that are rendered, i.e. not inside script, style or noscript.
+_VISIBLE_TEXT = (
+    ".//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]"
+)
 
-def extract_with_trafilatura(html: str, url: str) -> str | None:
+
+def extract_with_trafilatura(html: str | HtmlElement, url: str) -> str | None:
     try:
         content = trafilatura.extract(
             html,
@@ -20,7 +37,7 @@ def extract_with_trafilatura(html: str, url: str) -> str | None:
         return None
 
 
-def extract_with_readability(html: str) -> str | None:
+def extract_with_readability(html: str | HtmlElement) -> str | None:
     try:
         doc = Document(html)
         summary = doc.summary()
@@ -38,22 +55,179 @@ def extract_with_readability(html: str) -> str | None:
         return None
 
 
+def extract_with_html2text(html: str | HtmlElement) -> str | None:
+    if isinstance(html, HtmlElement):
+        html = tostring(html, encoding="unicode")
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.ignore_images = True
+    h.body_width = 0
+    try:
+        content = h.handle(html)
+        return content[:50000] if content else None
+    except Exception:
+        return None
+
+
+def score_page(tree: HtmlElement) -> dict:
+    """Cheap layout signals used to pick the extractor to try first."""
+    body = tree.find("body")
+    if body is None:
+        body = tree
+
+    text_chars = sum(len(t.strip()) for t in body.xpath(_VISIBLE_TEXT))
+    link_chars = sum(len(t.strip()) for t in body.xpath(".//a//text()"))
+    paragraph_chars = sum(len(t.strip()) for t in body.xpath(".//p//text()"))
+    elements = int(body.xpath("count(.//*)"))
+
+    return {
+        "text_chars": text_chars,
+        "link_ratio": link_chars / text_chars if text_chars else 0.0,
+        "paragraph_ratio": paragraph_chars / text_chars if text_chars else 0.0,
+        "text_density": text_chars / elements if elements else float(text_chars),
+    }
+
+
+def choose_extractors(score: dict, hint: str | None = None) -> list[str]:
+    if score["text_chars"] < 200 or score["link_ratio"] > 0.6:
+        # Link lists and near-empty pages: the article extractors would
+        # discard nearly everything.
+        first = "html2text"
+    elif hint in ("trafilatura", "readability"):
+        first = hint
+    elif score["paragraph_ratio"] < 0.3 and score["text_density"] < 10:
+        first = "readability"
+    else:
+        first = "trafilatura"
+    return [first] + [name for name in EXTRACTORS if name != first]
+
+
+def extract(html: str, url: str, hint: str | None = None) -> tuple[str, str | None]:
+    """Extract markdown from html, parsing it only once.
+
+    Returns the content and the name of the extractor that produced it.
+    hint is the extractor that worked before for the same domain.
+    """
+    try:
+        tree = load_html(html)
+    except Exception:
+        tree = None
+    if tree is None:
+        content = extract_with_html2text(html)
+        return (content, "html2text") if content else ("", None)
+
+    for name in choose_extractors(score_page(tree), hint):
+        if name == "trafilatura":
+            content = extract_with_trafilatura(tree, url)
+        elif name == "readability":
+            # Readability edits the tree it is given.
+            content = extract_with_readability(copy.deepcopy(tree))
+        else:
+            content = extract_with_html2text(tree)
+        if content:
+            return content, name
+
+    return "", None
+
+
 def extract_content(html: str, url: str) -> str:
-    content = extract_with_trafilatura(html, url)
+    return extract(html, url)[0]
 
-    if not content:
-        content = extract_with_readability(html)
 
-    if not content:
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.ignore_images = True
-        h.body_width = 0
+def _warm_worker() -> None:
+    extract_content("<html><body><p>warm</p></body></html>", "")
+
+
+def _ping() -> bool:
+    return True
+
+
+class ExtractionPool:
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        queue_size: int | None = None,
+        timeout: float | None = None,
+        max_html_chars: int | None = None,
+    ):
+        self.max_workers = settings.extract_workers if max_workers is None else max_workers
+        self.queue_size = queue_size or settings.extract_queue_size
+        self.timeout = timeout or settings.extract_timeout
+        self.max_html_chars = max_html_chars or settings.extract_max_html_chars
+        # Slots are held until the worker finishes, even after a timeout,
+        # so abandoned tasks still count against the queue bound.
+        self._slots = asyncio.Semaphore(max(self.max_workers, 1) + self.queue_size)
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def initialize(self) -> None:
+        if self.max_workers <= 0 or self._executor:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _ping)
+            for _ in range(self.max_workers)
+        ])
+
+    async def close(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def extract(
+        self, html: str, url: str, hint: str | None = None
+    ) -> tuple[str | None, str | None]:
+        """Extract html in a worker, as extract() does.
+
+        The content is None, rather than empty, when extraction did not run
+        to completion: no slot freed up, it timed out or the pool broke. A
+        timed-out worker is stuck on the page, so the pool is recycled.
+        """
+        if self.max_workers > 0 and not self._executor:
+            await self.initialize()
+
+        html = html[:self.max_html_chars]
+        loop = asyncio.get_running_loop()
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return None, None
+
+        executor = self._executor
         try:
-            content = h.handle(html)
-            if content:
-                content = content[:50000]
-        except Exception:
-            content = ""
+            future = loop.run_in_executor(executor, extract, html, url, hint)
+        except BrokenProcessPool:
+            self._slots.release()
+            await self._restart(executor)
+            return None, None
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except (asyncio.TimeoutError, BrokenProcessPool):
+            await self._restart(executor)
+            return None, None
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()
+
+    async def _restart(self, executor: ProcessPoolExecutor | None) -> None:
+        if executor is not None and self._executor is executor:
+            self._executor = None
+            # shutdown() leaves running jobs alone; a stuck worker has to be
+            # killed to get its slot back. Jobs of the other workers fail
+            # with BrokenProcessPool.
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+            executor.shutdown(wait=False, cancel_futures=True)
+            await self.initialize()
+
 
-    return content or ""
+extraction_pool = ExtractionPool()
@@ -1,68 +1,701 @@
 import asyncio
+import ipaddress
+import os
+import re
+import socket
+import time
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 from urllib.parse import urlparse
 
+import httpcore
 import httpx
-from playwright.async_api import async_playwright, Browser, BrowserContext
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route
 
 from config import settings
 
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+
+# Markers of pages that only render their content with JavaScript, matched
+# in one case-insensitive pass.
+_JS_INDICATORS = re.compile(
+    "|".join(re.escape(indicator) for indicator in [
+        "please enable javascript",
+        "javascript is required",
+        "enable javascript to view",
+        "requires javascript",
+        "noscript",
+        "__NEXT_DATA__",
+        "window.__INITIAL_STATE__",
+    ]),
+    re.IGNORECASE,
+)
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+# Served as-is instead of being run through the HTML extractors.
+TEXT_TYPES = {"text/plain", "text/markdown", "text/x-markdown"}
+
+
+@dataclass
+class FetchResult:
+    html: str | None
+    canonical_url: str
+    not_modified: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    max_age: int | None = None
+    throttled: bool = False
+    content_type: str | None = None
+    text: str | None = None
+    truncated: bool = False
+    rendered: bool = False
+    attempts: list[str] = field(default_factory=list)  # strategies tried, in order
+
+    @property
+    def unsupported(self) -> bool:
+        return self.content_type is not None and self.content_type not in (
+            HTML_TYPES | TEXT_TYPES
+        )
+
+
+def parse_max_age(cache_control: str | None) -> int | None:
+    if not cache_control:
+        return None
+
+    directives = [d.strip().lower() for d in cache_control.split(",")]
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+
+    max_age = None
+    for directive in directives:
+        name, _, value = directive.partition("=")
+        if name in ("max-age", "s-maxage") and value.strip('"').isdigit():
+            # s-maxage applies to shared caches like this one and wins.
+            if name == "s-maxage" or max_age is None:
+                max_age = int(value.strip('"'))
+    return max_age
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def content_type(response: httpx.Response) -> str | None:
+    value = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    return value or None
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches getaddrinfo results in process.
+
+    TLS still verifies against the hostname; only the TCP connect goes to a
+    cached address. A failed connect drops the host's entry.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _resolve(self, host: str, port: int) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+
+        if len(self._cache) >= 1024:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (now + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        error: Exception | None = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout: float | None = None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+class _HostState:
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+        self.retry_at = 0.0  # Retry-After given by the host, uncapped
+        self.users = 0
+
+
+class HostThrottled(Exception):
+    """The host asked to be left alone for longer than we are willing to wait."""
+
+
+class HostScheduler:
+    """Limit concurrency and pace request starts per host.
+
+    Every host has its own FIFO queue of slots, so a busy or throttling host
+    only delays its own requests and the others keep their throughput.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        min_interval: float | None = None,
+        max_delay: float | None = None
+    ):
+        self.max_concurrency = max_concurrency or settings.fetch_host_concurrency
+        self.min_interval = (
+            settings.fetch_host_interval if min_interval is None else min_interval
+        )
+        self.max_delay = (
+            settings.fetch_max_retry_after if max_delay is None else max_delay
+        )
+        self._hosts: dict[str, _HostState] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= 256:
+                self._prune()
+            state = self._hosts[host] = _HostState(self.max_concurrency)
+        return state
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for host, state in list(self._hosts.items()):
+            if state.users == 0 and max(state.next_start, state.retry_at) <= now:
+                del self._hosts[host]
+
+    def _check(self, state: _HostState) -> None:
+        if state.retry_at - time.monotonic() > self.max_delay:
+            raise HostThrottled()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for the host's next start, at most max_delay.
+
+        Raises HostThrottled while the host's Retry-After runs further out.
+        """
+        host = self._host(url)
+        state = self._state(host)
+        self._check(state)
+
+        state.users += 1
+        try:
+            async with state.semaphore:
+                # Starts are spaced one at a time, in arrival order.
+                async with state.lock:
+                    # A Retry-After may have arrived while this one queued.
+                    self._check(state)
+                    delay = max(state.next_start, state.retry_at) - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    state.next_start = max(
+                        state.next_start, time.monotonic() + self.min_interval
+                    )
+                yield
+        finally:
+            state.users -= 1
+
+    def defer(self, url: str, seconds: float) -> None:
+        """Hold back further requests to the host after a Retry-After.
+
+        Requests wait out up to max_delay of it; past that they are refused.
+        """
+        state = self._state(self._host(url))
+        state.retry_at = max(state.retry_at, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        return {
+            "hosts": len(self._hosts),
+            "requests": sum(s.users for s in self._hosts.values()),
+        }
+
+
+# Clears the current origin's storage before a pooled page is reused. Throws
+# if IndexedDB or Cache Storage cannot be cleared, so the context is dropped.
+_CLEAR_STORAGE_JS = """async () => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+    if (self.indexedDB) {
+        for (const db of await indexedDB.databases()) {
+            await new Promise(resolve => {
+                const request = indexedDB.deleteDatabase(db.name);
+                // Blocked by the page's own connections: completes on unload.
+                request.onsuccess = request.onerror = request.onblocked = resolve;
+            });
+        }
+    }
+    if (self.caches) {
+        for (const key of await caches.keys()) {
+            await caches.delete(key);
+        }
+    }
+}"""
+
+
+def _origin(url: str) -> str | None:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+
+# Resolves once the DOM has stopped changing, or the body text has stopped
+# growing, for quietMs, or when deadlineMs has passed.
+_WAIT_FOR_READY_JS = """([quietMs, deadlineMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let lastMutation = start;
+    let lastGrowth = start;
+    let lastLength = -1;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document, { subtree: true, childList: true, characterData: true });
+    const check = () => {
+        const now = performance.now();
+        const length = document.body ? document.body.textContent.length : 0;
+        if (length !== lastLength) {
+            lastLength = length;
+            lastGrowth = now;
+        }
+        const settled = now - lastMutation >= quietMs || now - lastGrowth >= quietMs;
+        if ((length > 0 && settled) || now - start >= deadlineMs) {
+            observer.disconnect();
+            resolve(length);
+        } else {
+            setTimeout(check, 100);
+        }
+    };
+    check();
+})"""
+
+
+def is_blocked_host(host: str | None) -> bool:
+    if not host:
+        return False
+    host = host.lower()
+    return any(
+        host == domain or host.endswith("." + domain)
+        for domain in settings.playwright_blocked_domains
+    )
+
+
+def browser_rss() -> int | None:
+    """Resident memory of this process's non-Python descendants, in bytes.
+
+    That is the Playwright driver and the browser with its content
+    processes; the extraction workers are Python and are left out. Returns
+    None where /proc is not available.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    parents: dict[int, int] = {}
+    sizes: dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name is parenthesized and may contain spaces.
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        pid = int(entry.name)
+        parents[pid] = int(fields[1])
+        if not name.startswith("python"):
+            sizes[pid] = int(fields[21])
+
+    root = os.getpid()
+    total = 0
+    for pid, pages in sizes.items():
+        parent = parents.get(pid)
+        while parent and parent != root:
+            parent = parents.get(parent)
+        if parent == root:
+            total += pages
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+@dataclass
+class _PooledPage:
+    context: BrowserContext
+    page: Page
+    generation: int
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    # Origins whose documents ran in the page (redirects and iframes
+    # included) since its last reset.
+    origins: set[str] = field(default_factory=set)
+
 
 class PlaywrightPool:
+    """Pool of warm browser contexts, each with one page, reused across renders.
+
+    A page is reset (storage, cookies and permissions cleared) when it is
+    returned and retired after playwright_context_max_uses renders or
+    playwright_context_max_age seconds. Storage can only be cleared for the
+    origin the page ends on, so a page that ran documents from more than one
+    origin is retired instead. Service workers are blocked. max_contexts
+    bounds how many are in use at once.
+    """
+
     def __init__(self, max_contexts: int | None = None):
         self.max_contexts = max_contexts or settings.playwright_max_contexts
         self.semaphore = asyncio.Semaphore(self.max_contexts)
         self._playwright = None
         self._browser: Browser | None = None
         self._initialized = False
+        self._lock = asyncio.Lock()
+        self._idle: list[_PooledPage] = []
+        self._generation = 0
+        self.in_use = 0
+        self.created = 0
+        self.retired = 0
+        self.acquired = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.blocked_requests = 0
+        self.launches = 0
+        self.crashes = 0
+        self.recycles = 0
+        self.crashed = False
+        self.rss_bytes: int | None = None
+        self.last_error: str | None = None
 
     async def initialize(self) -> None:
+        async with self._lock:
+            if self._initialized:
+                return
+            await self._launch()
+
+    async def _launch(self) -> None:
+        try:
+            if not self._playwright:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.firefox.launch(
+                headless=True,
+                args=["--disable-gpu"]
+            )
+        except Exception as e:
+            self.last_error = str(e).splitlines()[0]
+            # The driver may be what died; start it afresh next time.
+            if self._playwright:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+            raise
+
+        browser = self._browser
+        browser.on("disconnected", lambda: self._on_disconnected(browser))
+        self._initialized = True
+        self.crashed = False
+        self.launches += 1
+        for _ in range(min(settings.playwright_warm_contexts, self.max_contexts)):
+            self._idle.append(await self._new_page())
+
+    def _on_disconnected(self, browser: Browser) -> None:
+        # Only an unexpected exit of the current browser counts as a crash;
+        # the next render relaunches it.
+        if browser is not self._browser:
+            return
+        self.crashes += 1
+        self.crashed = True
+        self._drop_browser()
+
+    def _drop_browser(self) -> None:
+        # Pages still in use are discarded when they are returned.
+        self._generation += 1
+        self._idle = []
+        self._browser = None
+        self._initialized = False
+
+    async def _shutdown_browser(self) -> None:
+        browser = self._browser
+        self._drop_browser()
+        if browser:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._shutdown_browser()
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def recycle(self) -> None:
+        """Relaunch the browser once the renders in progress have finished."""
+        # Slots before the lock, the same order get_page takes them in.
+        for _ in range(self.max_contexts):
+            await self.semaphore.acquire()
+        try:
+            async with self._lock:
+                await self._shutdown_browser()
+                self.recycles += 1
+                await self._launch()
+        finally:
+            for _ in range(self.max_contexts):
+                self.semaphore.release()
+
+    async def check(self) -> None:
+        """Relaunch a dead browser and recycle one that uses too much memory."""
+        if self._initialized and not self._browser.is_connected():
+            self._on_disconnected(self._browser)
+        if self.crashed:
+            await self.initialize()
+            return
+        if not self._initialized:
+            return
+
+        self.rss_bytes = await asyncio.to_thread(browser_rss)
+        limit = settings.playwright_max_rss_bytes
+        if limit and self.rss_bytes and self.rss_bytes > limit:
+            await self.recycle()
+            self.rss_bytes = await asyncio.to_thread(browser_rss)
+
+    async def run_supervisor(self, interval: int | None = None) -> None:
+        interval = interval or settings.playwright_check_interval
+        if settings.playwright_prewarm:
+            try:
+                await self.initialize()
+            except Exception:
+                pass
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check()
+            except Exception as e:
+                self.last_error = str(e).splitlines()[0]
+
+    @property
+    def state(self) -> str:
         if self._initialized:
+            return "running"
+        return "crashed" if self.crashed else "stopped"
+
+    async def _new_page(self) -> _PooledPage:
+        context = await self._browser.new_context(
+            viewport={"width": 1280, "height": 720},
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) "
+                "Gecko/20100101 Firefox/121.0"
+            ),
+            java_script_enabled=True,
+            # Workers would outlive the render and bypass request routing.
+            service_workers="block",
+        )
+        await context.route("**/*", self._route)
+        page = await context.new_page()
+        pooled = _PooledPage(context=context, page=page, generation=self._generation)
+        page.on("framenavigated", lambda frame: self._track_origin(pooled, frame.url))
+        self.created += 1
+        return pooled
+
+    @staticmethod
+    def _track_origin(pooled: _PooledPage, url: str) -> None:
+        origin = _origin(url)
+        if origin:
+            pooled.origins.add(origin)
+
+    async def _route(self, route: Route) -> None:
+        request = route.request
+        # The page being rendered is loaded even on a blocked domain; only
+        # its subresources and frames are blocked.
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            await route.continue_()
             return
-        self._playwright = await async_playwright().start()
-        self._browser = await self._playwright.firefox.launch(
-            headless=True,
-            args=["--disable-gpu"]
+        if (
+            request.resource_type in settings.playwright_blocked_resource_types
+            or is_blocked_host(urlparse(request.url).hostname)
+        ):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _reusable(self, pooled: _PooledPage) -> bool:
+        return (
+            pooled.generation == self._generation
+            and pooled.uses < settings.playwright_context_max_uses
+            and time.monotonic() - pooled.created_at < settings.playwright_context_max_age
+            and len(pooled.origins) <= 1
+            and not pooled.page.is_closed()
         )
-        self._initialized = True
 
-    async def close(self) -> None:
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-        if self._playwright:
-            await self._playwright.stop()
-            self._playwright = None
-        self._initialized = False
+    async def _reset(self, pooled: _PooledPage) -> bool:
+        try:
+            if pooled.origins:
+                if _origin(pooled.page.url) not in pooled.origins:
+                    # Not on the origin that stored data, e.g. an error page.
+                    return False
+                await pooled.page.evaluate(_CLEAR_STORAGE_JS)
+            await pooled.page.goto("about:blank")
+            await pooled.context.clear_cookies()
+            await pooled.context.clear_permissions()
+            pooled.origins.clear()
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, pooled: _PooledPage) -> None:
+        self.retired += 1
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
 
     @asynccontextmanager
-    async def get_context(self):
+    async def get_page(self):
         if not self._initialized:
             await self.initialize()
 
+        wait_start = time.monotonic()
         async with self.semaphore:
-            context = await self._browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) "
-                    "Gecko/20100101 Firefox/121.0"
-                ),
-                java_script_enabled=True,
-            )
+            waited = time.monotonic() - wait_start
+            self.acquired += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+            if not self._initialized:
+                # The browser crashed while this render was queued.
+                await self.initialize()
+
+            pooled = None
+            while self._idle and pooled is None:
+                candidate = self._idle.pop()
+                if self._reusable(candidate):
+                    pooled = candidate
+                else:
+                    await self._discard(candidate)
+            if pooled is None:
+                pooled = await self._new_page()
+
+            self.in_use += 1
             try:
-                yield context
+                yield pooled.page
             finally:
-                await context.close()
+                self.in_use -= 1
+                pooled.uses += 1
+                if self._reusable(pooled) and await self._reset(pooled):
+                    self._idle.append(pooled)
+                else:
+                    await self._discard(pooled)
+
+    def stats(self) -> dict:
+        return {
+            "max_contexts": self.max_contexts,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            "created": self.created,
+            "retired": self.retired,
+            "acquired": self.acquired,
+            "avg_wait_ms": int(self.wait_time_total / self.acquired * 1000)
+            if self.acquired else 0,
+            "max_wait_ms": int(self.wait_time_max * 1000),
+            "blocked_requests": self.blocked_requests,
+            "state": self.state,
+            "launches": self.launches,
+            "crashes": self.crashes,
+            "recycles": self.recycles,
+            "rss_bytes": self.rss_bytes,
+            "last_error": self.last_error,
+        }
 
 
 class Fetcher:
     def __init__(self):
         self._http_client: httpx.AsyncClient | None = None
+        self._transport: httpx.AsyncHTTPTransport | None = None
+        self._dns: CachingDNSBackend | None = None
         self._playwright_pool = PlaywrightPool()
+        self._scheduler = HostScheduler()
 
     async def initialize(self) -> None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=settings.fetch_http2 and h2 is not None,
+            limits=httpx.Limits(
+                max_connections=settings.fetch_max_connections,
+                max_keepalive_connections=settings.fetch_max_keepalive_connections,
+                keepalive_expiry=settings.fetch_keepalive_expiry,
+            ),
+        )
+        if settings.fetch_dns_ttl > 0:
+            self._dns = CachingDNSBackend(settings.fetch_dns_ttl)
+            # httpx has no public hook for the network backend.
+            transport._pool._network_backend = self._dns
+
+        self._transport = transport
         self._http_client = httpx.AsyncClient(
-            timeout=15.0,
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.fetch_read_timeout,
+                connect=settings.fetch_connect_timeout,
+            ),
             follow_redirects=True,
             headers={
                 "User-Agent": (
@@ -74,79 +707,224 @@ class Fetcher:
             }
         )
 
+    async def run_browser_supervisor(self) -> None:
+        await self._playwright_pool.run_supervisor()
+
+    def stats(self) -> dict:
+        connections = []
+        if self._transport:
+            connections = self._transport._pool.connections
+        return {
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "http2_connections": sum(
+                1 for c in connections if "HTTP/2" in c.info()
+            ),
+            "dns": self._dns.stats() if self._dns else None,
+            "hosts": self._scheduler.stats(),
+            "playwright": self._playwright_pool.stats(),
+        }
+
     async def close(self) -> None:
         if self._http_client:
             await self._http_client.aclose()
             self._http_client = None
+            self._transport = None
         await self._playwright_pool.close()
 
-    def _needs_js_render(self, url: str, html: str | None) -> bool:
+    def _needs_js_render(self, html: str | None) -> bool:
         if html is None:
             return True
         if len(html.strip()) < 500:
             return True
+        return _JS_INDICATORS.search(html) is not None
 
-        js_indicators = [
-            "please enable javascript",
-            "javascript is required",
-            "enable javascript to view",
-            "requires javascript",
-            "noscript",
-            "__NEXT_DATA__",
-            "window.__INITIAL_STATE__",
-        ]
-        html_lower = html.lower()
-        for indicator in js_indicators:
-            if indicator.lower() in html_lower:
-                return True
-
-        domain = urlparse(url).netloc.lower()
-        for spa_domain in settings.spa_domains:
-            if spa_domain in domain:
-                return True
-
-        return False
-
-    async def _fast_fetch(self, url: str) -> tuple[str | None, str]:
+    async def _fast_fetch(
+        self,
+        url: str,
+        validators: dict | None = None
+    ) -> FetchResult:
         if not self._http_client:
             await self.initialize()
 
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
         try:
-            response = await self._http_client.get(url)
+            response, body, truncated = await self._get(url, headers)
+            result = FetchResult(
+                html=None,
+                canonical_url=str(response.url),
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                max_age=parse_max_age(response.headers.get("cache-control")),
+                content_type=content_type(response),
+                truncated=truncated,
+            )
+            if response.status_code == 304 and headers:
+                result.not_modified = True
+                return result
             response.raise_for_status()
-            canonical_url = str(response.url)
-            return response.text, canonical_url
-        except (httpx.HTTPStatusError, httpx.RequestError):
-            return None, url
+            if body is not None:
+                text = body.decode(response.encoding or "utf-8", errors="replace")
+                if result.content_type in TEXT_TYPES:
+                    result.text = text
+                else:
+                    result.html = text
+            return result
+        except httpx.HTTPStatusError as e:
+            return FetchResult(
+                html=None,
+                canonical_url=url,
+                throttled=e.response.status_code == 429,
+            )
+        except HostThrottled:
+            return FetchResult(html=None, canonical_url=url, throttled=True)
+        except httpx.RequestError:
+            return FetchResult(html=None, canonical_url=url)
 
-    async def _js_fetch(self, url: str) -> tuple[str | None, str]:
-        try:
-            async with self._playwright_pool.get_context() as context:
-                page = await context.new_page()
-                await page.goto(url, wait_until="networkidle", timeout=30000)
+    async def _get(
+        self, url: str, headers: dict
+    ) -> tuple[httpx.Response, bytes | None, bool]:
+        """GET url within its host slot, retrying once after a short Retry-After.
+
+        Only successful HTML and text responses have their body read, capped
+        at fetch_max_body_bytes; anything else is closed unread.
+        """
+        retried = False
+        while True:
+            async with self._scheduler.slot(url):
+                request = self._http_client.build_request("GET", url, headers=headers)
+                response = await self._http_client.send(request, stream=True)
+                try:
+                    body, truncated = None, False
+                    kind = content_type(response)
+                    if response.is_success and (
+                        kind is None or kind in HTML_TYPES | TEXT_TYPES
+                    ):
+                        body, truncated = await self._read_capped(response)
+                finally:
+                    await response.aclose()
 
-                await asyncio.sleep(1)
+            if response.status_code not in (429, 503):
+                return response, body, truncated
 
-                html = await page.content()
-                canonical_url = page.url
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if retry_after is None:
+                return response, body, truncated
+            self._scheduler.defer(url, retry_after)
+            if retried or retry_after > settings.fetch_max_retry_after:
+                return response, body, truncated
+            retried = True
 
-                await page.close()
-                return html, canonical_url
+    async def _read_capped(self, response: httpx.Response) -> tuple[bytes, bool]:
+        limit = settings.fetch_max_body_bytes
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            if size + len(chunk) > limit:
+                chunks.append(chunk[:limit - size])
+                return b"".join(chunks), True
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks), False
+
+    async def _wait_until_ready(self, page: Page) -> None:
+        deadline = settings.playwright_ready_timeout
+        try:
+            await asyncio.wait_for(
+                page.evaluate(
+                    _WAIT_FOR_READY_JS,
+                    [settings.playwright_ready_quiet_ms, deadline * 1000],
+                ),
+                timeout=deadline + 1,
+            )
         except Exception:
-            return None, url
+            # A client-side redirect or a hung page: take what has rendered.
+            pass
 
-    async def fetch(self, url: str, force_js: bool = False) -> tuple[str | None, str]:
-        if force_js:
-            return await self._js_fetch(url)
+    async def _js_fetch(self, url: str) -> tuple[str | None, str]:
+        """Render url in a pooled page; raises HostThrottled like slot().
+
+        The host slot is taken first, so a page is never held while waiting
+        on a slow or throttling host.
+        """
+        async with self._scheduler.slot(url):
+            try:
+                async with self._playwright_pool.get_page() as page:
+                    await page.goto(
+                        url,
+                        wait_until="domcontentloaded",
+                        timeout=settings.playwright_navigation_timeout * 1000,
+                    )
+
+                    await self._wait_until_ready(page)
+
+                    html = await page.content()
+                    canonical_url = page.url
+                    return html, canonical_url
+            except Exception:
+                return None, url
 
-        html, canonical_url = await self._fast_fetch(url)
+    async def fetch(
+        self,
+        url: str,
+        force_js: bool = False,
+        validators: dict | None = None,
+        prefer_js: bool = False
+    ) -> FetchResult:
+        """Fetch url with httpx, rendering it with Playwright when needed.
 
-        if self._needs_js_render(url, html):
-            js_html, js_url = await self._js_fetch(url)
+        force_js renders only. prefer_js renders first and falls back to the
+        fast path if rendering fails; otherwise the fast path goes first and
+        pages that look JS-dependent are rendered.
+        """
+        if force_js or prefer_js:
+            try:
+                html, canonical_url = await self._js_fetch(url)
+            except HostThrottled:
+                return FetchResult(
+                    html=None, canonical_url=url, throttled=True, attempts=["js"]
+                )
+            if html or force_js:
+                return FetchResult(
+                    html=html, canonical_url=canonical_url, rendered=True, attempts=["js"]
+                )
+
+        result = await self._fast_fetch(url, validators)
+        result.attempts = ["js", "fast"] if prefer_js else ["fast"]
+        if (
+            prefer_js
+            or result.not_modified
+            or result.throttled
+            or result.truncated
+            or result.text is not None
+            or result.unsupported
+        ):
+            # A throttled host would refuse the browser too, and rendering
+            # cannot turn a huge page or a non-HTML payload into a better one.
+            return result
+
+        if self._needs_js_render(result.html):
+            result.attempts.append("js")
+            try:
+                js_html, js_url = await self._js_fetch(url)
+            except HostThrottled:
+                return result
             if js_html:
-                return js_html, js_url
+                # Validators describe the raw response, not the rendered DOM.
+                return FetchResult(
+                    html=js_html,
+                    canonical_url=js_url,
+                    rendered=True,
+                    attempts=result.attempts,
+                )
 
-        return html, canonical_url
+        return result
 
 
 fetcher = Fetcher()
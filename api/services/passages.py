@@ -0,0 +1,183 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from config import settings
+
+_TOKEN = re.compile(r"\w+")
+_BLOCK_BREAK = re.compile(r"\n\s*\n")
+
+# BM25 parameters, the usual defaults.
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English prose.
+    return (len(text) + 3) // 4
+
+
+def split_passages(markdown: str, max_chars: int | None = None) -> list[str]:
+    """Split markdown into passages of up to max_chars.
+
+    Consecutive blocks (paragraphs, lists, tables) are merged until the next
+    one would not fit; a block longer than max_chars is cut on line breaks,
+    or hard-cut when a single line is too long.
+    """
+    max_chars = max_chars or settings.passage_max_chars
+    passages: list[str] = []
+    current = ""
+
+    for block in _BLOCK_BREAK.split(markdown):
+        block = block.strip()
+        if not block:
+            continue
+        if current and len(current) + len(block) + 2 <= max_chars:
+            current = f"{current}\n\n{block}"
+            continue
+        if current:
+            passages.append(current)
+        current = ""
+        while len(block) > max_chars:
+            cut = block.rfind("\n", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            passages.append(block[:cut].strip())
+            block = block[cut:].strip()
+        current = block
+
+    if current:
+        passages.append(current)
+    return passages
+
+
+def bm25_scores(passages: list[list[str]], query: list[str]) -> list[float]:
+    """Okapi BM25 score of each tokenized passage for the query terms."""
+    if not passages:
+        return []
+    terms = set(query)
+    counts = [Counter(tokens) for tokens in passages]
+    lengths = [len(tokens) for tokens in passages]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    n = len(passages)
+    idf = {}
+    for term in terms:
+        df = sum(1 for c in counts if term in c)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for c, length in zip(counts, lengths):
+        norm = _K1 * (1 - _B + _B * length / avg_length)
+        score = 0.0
+        for term in terms:
+            tf = c.get(term)
+            if tf:
+                score += idf[term] * tf * (_K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+@dataclass
+class Selection:
+    text: str
+    passages: int
+    selected: int
+    input_tokens: int
+    selected_tokens: int
+
+    @property
+    def ratio(self) -> float:
+        """Share of the input that was kept, 1.0 when nothing was cut."""
+        if not self.input_tokens:
+            return 1.0
+        return round(self.selected_tokens / self.input_tokens, 3)
+
+
+def select_passages(
+    markdown: str, query: str | None = None, token_budget: int | None = None
+) -> Selection:
+    """Keep the passages most relevant to query within token_budget.
+
+    Passages are ranked with BM25 and the best ones that fit are returned
+    in document order. Without a query, or when no passage matches it, the
+    leading passages are kept instead.
+    """
+    token_budget = token_budget or settings.summary_token_budget
+    passages = split_passages(markdown)
+    sizes = [estimate_tokens(p) for p in passages]
+    input_tokens = sum(sizes)
+
+    order = list(range(len(passages)))
+    query_terms = tokenize(query) if query else []
+    if query_terms and input_tokens > token_budget:
+        scores = bm25_scores([tokenize(p) for p in passages], query_terms)
+        if any(scores):
+            # Stable sort: ties keep document order.
+            order.sort(key=lambda i: -scores[i])
+
+    chosen = []
+    used = 0
+    for i in order:
+        if used + sizes[i] > token_budget:
+            continue
+        chosen.append(i)
+        used += sizes[i]
+    chosen.sort()
+    text = "\n\n".join(passages[i] for i in chosen)
+
+    if passages and not chosen:
+        # Budget smaller than any passage: cut the first one to fit.
+        text = passages[0][:token_budget * 4]
+        chosen = [0]
+        used = estimate_tokens(text)
+
+    return Selection(
+        text=text,
+        passages=len(passages),
+        selected=len(chosen),
+        input_tokens=input_tokens,
+        selected_tokens=used,
+    )
+
+
+def top_passages(
+    documents: list[str],
+    query: str,
+    k: int,
+    max_chars: int,
+    across: bool = False,
+) -> list[list[tuple[str, float]]]:
+    """Return the passages of each document that best match query.
+
+    All passages are scored as one corpus, so scores are comparable between
+    documents. Per document, up to k passages totalling at most max_chars
+    are kept; with across, k and max_chars apply to all documents together.
+    Passages that share no term with the query are never returned. Each
+    list is ordered best first.
+    """
+    chunks = [(index, passage) for index, document in enumerate(documents)
+              for passage in split_passages(document)]
+    scores = bm25_scores([tokenize(passage) for _, passage in chunks], tokenize(query))
+    ranked = sorted(
+        (i for i, score in enumerate(scores) if score > 0),
+        key=lambda i: -scores[i],
+    )
+
+    selected: list[list[tuple[str, float]]] = [[] for _ in documents]
+    # Budgets are kept per document, or all in slot 0 when across.
+    counts = [0] * len(documents)
+    chars = [0] * len(documents)
+    for i in ranked:
+        index, passage = chunks[i]
+        slot = 0 if across else index
+        if counts[slot] >= k or chars[slot] + len(passage) > max_chars:
+            continue
+        selected[index].append((passage, round(scores[i], 3)))
+        counts[slot] += 1
+        chars[slot] += len(passage)
+    return selected
@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from cache import cache
+from config import settings
+from .extractor import extraction_pool
+from .render_profiles import render_profiles
+
+OUTCOMES = ("updated", "unchanged", "missing", "failed")
+
+
+async def reextract(url: str) -> str:
+    """Re-run extraction on the stored snapshot of url and update its content."""
+    snapshot = await cache.get_snapshot(url)
+    if not snapshot:
+        return "missing"
+
+    markdown, _ = await extraction_pool.extract(
+        snapshot["html"],
+        snapshot["canonical_url"],
+        hint=await render_profiles.extractor_hint(url),
+    )
+    if not markdown:
+        return "failed"
+    if cache.hash_content(markdown) == await cache.get_content_hash(url):
+        return "unchanged"
+
+    if not await cache.replace_markdown(url, markdown):
+        await cache.set_content(url, snapshot["canonical_url"], markdown)
+    return "updated"
+
+
+class ReextractJobs:
+    """Background jobs that re-extract stored snapshots, single or in bulk."""
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, dict] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self, urls: list[str] | None = None) -> dict:
+        """Start a job over urls, or over every live snapshot if urls is None."""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "running",
+            "total": len(urls) if urls is not None else None,
+            "done": 0,
+            **{outcome: 0 for outcome in OUTCOMES},
+            "created_at": datetime.now(timezone.utc),
+            "finished_at": None,
+            "error": None,
+        }
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest]["status"] == "running":
+                break
+            del self._jobs[oldest]
+
+        task = asyncio.create_task(self._run(job, urls))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job: dict, urls: list[str] | None) -> None:
+        try:
+            if urls is not None:
+                await self._process(job, urls)
+            else:
+                job["total"] = 0
+                after = ""
+                while batch := await cache.list_snapshot_urls(after):
+                    job["total"] += len(batch)
+                    await self._process(job, batch)
+                    after = batch[-1]
+            job["status"] = "done"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc)
+
+    async def _process(self, job: dict, urls: list[str]) -> None:
+        # Leave room in the extraction pool for live fetches.
+        semaphore = asyncio.Semaphore(max(settings.extract_workers - 1, 1))
+
+        async def run(url: str) -> None:
+            async with semaphore:
+                try:
+                    outcome = await reextract(url)
+                except Exception:
+                    outcome = "failed"
+            job[outcome] += 1
+            job["done"] += 1
+
+        await asyncio.gather(*[run(url) for url in urls])
+
+
+reextract_jobs = ReextractJobs()
@@ -0,0 +1,108 @@
+import asyncio
+import random
+from urllib.parse import urlparse
+
+from cache import cache
+from config import settings
+
+STRATEGIES = ("fast", "js")
+
+# Weight of the newest fetch in the moving average of extracted characters.
+_ALPHA = 0.3
+
+
+def _js_wins(profile: dict) -> bool:
+    fast, js = profile["fast"], profile["js"]
+    # Rendering costs far more, so it has to extract clearly more.
+    return js["ok"] > 0 and js["chars"] > 2 * fast["chars"]
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class RenderProfiles:
+    """Per-domain record of how the fast and JS fetch paths perform.
+
+    For each strategy a profile counts attempts and attempts that produced
+    content, and keeps a moving average of the characters extracted (zero
+    for a failed attempt). Profiles live in memory and are written through
+    to the cache database.
+    """
+
+    def __init__(self):
+        self._profiles: dict[str, dict] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _load(self) -> dict[str, dict]:
+        if self._profiles is None:
+            async with self._lock:
+                if self._profiles is None:
+                    self._profiles = await cache.get_domain_profiles()
+        return self._profiles
+
+    async def prefer_js(self, url: str) -> bool:
+        profiles = await self._load()
+        domain = domain_of(url)
+        profile = profiles.get(domain)
+
+        if profile is None:
+            choice = any(
+                domain == spa or domain.endswith("." + spa)
+                for spa in settings.spa_domains
+            )
+        else:
+            choice = _js_wins(profile)
+
+        # Only explore the cheap way: a domain that renders well may since
+        # serve its content without JS. The fast path already renders pages
+        # that look JS-dependent, so the other way needs no exploring.
+        if choice and random.random() < settings.render_explore_rate:
+            return False
+        return choice
+
+    async def extractor_hint(self, url: str) -> str | None:
+        profiles = await self._load()
+        return profiles.get(domain_of(url), {}).get("extractor")
+
+    async def record(
+        self,
+        url: str,
+        attempts: list[str],
+        final: str | None,
+        chars: int,
+        extractor: str | None = None
+    ) -> None:
+        """Record a fetch: every attempt but the one that produced the page failed."""
+        if not attempts:
+            return
+
+        # Forced renders skip prefer_js, so profiles may not be loaded yet.
+        profiles = await self._load()
+        domain = domain_of(url)
+        profile = profiles.get(domain)
+        if profile is None:
+            profile = profiles[domain] = {
+                strategy: {"attempts": 0, "ok": 0, "chars": 0.0}
+                for strategy in STRATEGIES
+            }
+
+        for strategy in attempts:
+            got = chars if strategy == final else 0
+            stats = profile[strategy]
+            stats["attempts"] += 1
+            stats["ok"] += int(got > 0)
+            if stats["attempts"] == 1:
+                stats["chars"] = float(got)
+            else:
+                stats["chars"] = (1 - _ALPHA) * stats["chars"] + _ALPHA * got
+
+        if extractor in ("trafilatura", "readability"):
+            # html2text wins on link lists, which says nothing about articles.
+            profile["extractor"] = extractor
+
+        cache.set_domain_profile(domain, profile)
+
+
+render_profiles = RenderProfiles()
@@ -1,7 +1,19 @@
+import asyncio
+import math
+from dataclasses import dataclass
+
 import httpx
 from urllib.parse import urljoin
 
 from config import settings
+from urls import normalize_url
+
+
+@dataclass
+class GatheredHits:
+    hits: list[dict]
+    complete: bool  # every request finished before the deadline
+    next_page: int | None  # first page not requested; None once results ran out
 
 
 class SearXNGClient:
@@ -21,21 +33,116 @@ class SearXNGClient:
             await self._client.aclose()
             self._client = None
 
-    async def search(
+    async def gather_hits(
         self,
         query: str,
-        max_results: int = 10,
+        max_results: int | None = 10,
         engines: list[str] | None = None,
         categories: list[str] | None = None,
-        language: str = "en"
-    ) -> list[dict]:
+        language: str = "en",
+        timeout: float | None = None,
+        first_page: int = 1
+    ) -> "GatheredHits":
+        """Collect hits from as many result pages as needed to fill max_results.
+
+        Each round requests, in parallel, the pages expected to make up the
+        shortfall (at most searxng_pages). With searxng_split_engines each
+        engine is queried on its own and the hits are merged by score.
+        Requests still running after timeout (searxng_deadline by default)
+        are dropped. All hits found
+        are returned, possibly more than max_results.
+        """
         if not self._client:
             await self.initialize()
 
+        target = max_results or settings.searxng_min_results
+        loop = asyncio.get_running_loop()
+        end = loop.time() + (timeout or settings.searxng_deadline)
+
+        if engines and len(engines) > 1 and settings.searxng_split_engines:
+            groups = [[engine] for engine in engines]
+        else:
+            groups = [engines]
+        pages: list[list[list[dict]]] = [[] for _ in groups]
+        exhausted = [False] * len(groups)
+        errors: list[Exception] = []
+        answered = False
+        complete = True
+        hits: list[dict] = []
+
+        next_page = first_page
+        while next_page <= settings.searxng_max_pages:
+            shortfall = math.ceil((target - len(hits)) / settings.searxng_page_size)
+            batch = range(
+                next_page,
+                min(
+                    next_page + min(max(shortfall, 1), settings.searxng_pages),
+                    settings.searxng_max_pages + 1,
+                ),
+            )
+            next_page = batch.stop
+            tasks = {
+                asyncio.create_task(
+                    self._query(query, group, categories, language, pageno)
+                ): (index, pageno)
+                for index, group in enumerate(groups)
+                if not exhausted[index]
+                for pageno in batch
+            }
+            if not tasks:
+                break
+
+            try:
+                done, pending = await asyncio.wait(
+                    tasks, timeout=max(end - loop.time(), 0)
+                )
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            complete = complete and not pending
+            for task in sorted(done, key=lambda t: tasks[t][1]):
+                index, pageno = tasks[task]
+                if task.exception():
+                    errors.append(task.exception())
+                    continue
+                answered = True
+                results = task.result()
+                if not results:
+                    exhausted[index] = True
+                while len(pages[index]) < pageno:
+                    pages[index].append([])
+                pages[index][pageno - 1] = results
+
+            hits = self._merge(pages, scored=len(groups) > 1)
+            if pending or len(hits) >= target or all(exhausted):
+                break
+
+        if not hits:
+            if errors:
+                raise errors[0]
+            if not answered and not complete:
+                raise Exception("SearXNG did not answer before the deadline")
+        more = next_page <= settings.searxng_max_pages and not all(exhausted)
+        return GatheredHits(
+            hits=hits,
+            complete=complete and not errors,
+            next_page=next_page if more else None,
+        )
+
+    async def _query(
+        self,
+        query: str,
+        engines: list[str] | None,
+        categories: list[str] | None,
+        language: str,
+        pageno: int
+    ) -> list[dict]:
         params = {
             "q": query,
             "format": "json",
             "language": language,
+            "pageno": pageno,
         }
 
         if engines:
@@ -52,18 +159,38 @@ class SearXNGClient:
         except httpx.RequestError as e:
             raise Exception(f"SearXNG connection error: {str(e)}")
 
-        results = []
-        for item in data.get("results", [])[:max_results]:
-            result = {
-                "url": self._resolve_redirects(item.get("url", "")),
-                "title": item.get("title", ""),
-                "snippet": item.get("content", ""),
-                "engine": item.get("engine", ""),
-                "score": item.get("score", 0.0),
-            }
-            if result["url"]:
-                results.append(result)
+        return data.get("results", [])
 
+    def _merge(self, pages: list[list[list[dict]]], scored: bool) -> list[dict]:
+        """Dedup hits by URL in page order; scored merges sum duplicate scores."""
+        results = []
+        seen: dict[str, dict] = {}
+        found_by: dict[str, int] = {}
+        for index, group in enumerate(pages):
+            for page in group:
+                for item in page:
+                    result = {
+                        "url": self._resolve_redirects(item.get("url", "")),
+                        "title": item.get("title", ""),
+                        "snippet": item.get("content", ""),
+                        "engine": item.get("engine", ""),
+                        "score": item.get("score", 0.0),
+                    }
+                    if not result["url"]:
+                        continue
+                    key = normalize_url(result["url"])
+                    if key in seen:
+                        if found_by[key] != index:
+                            # Found by several engines, as SearXNG itself scores it.
+                            seen[key]["score"] += result["score"]
+                            found_by[key] = index
+                        continue
+                    seen[key] = result
+                    found_by[key] = index
+                    results.append(result)
+
+        if scored:
+            results.sort(key=lambda result: -result["score"])
         return results
 
     def _resolve_redirects(self, url: str) -> str:
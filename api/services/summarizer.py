@@ -1,6 +1,68 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Callable, NamedTuple
+
 import ollama
 
+from cache import cache
 from config import settings
+from .dedup import singleflight
+from .passages import select_passages
+
+# Priority lanes: lower runs first.
+INTERACTIVE = 0
+BULK = 1
+
+
+class OllamaScheduler:
+    """Cap concurrent Ollama requests; queued ones start by lane, then FIFO."""
+
+    def __init__(self, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency or settings.ollama_max_concurrency
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE):
+        if self.active < self.max_concurrency and not self.queued():
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            try:
+                # The releasing request hands its slot over directly.
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                else:
+                    future.cancel()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+
+class SummaryResult(NamedTuple):
+    summary: str
+    from_cache: bool
+    # Share of the page content sent to the model; None if it was not called.
+    input_ratio: float | None = None
 
 
 class Summarizer:
@@ -8,6 +70,7 @@ class Summarizer:
         self.host = host or settings.ollama_host
         self.model = model or settings.ollama_model
         self._client: ollama.AsyncClient | None = None
+        self.scheduler = OllamaScheduler()
 
     async def initialize(self) -> None:
         self._client = ollama.AsyncClient(host=self.host)
@@ -15,16 +78,69 @@ class Summarizer:
     async def close(self) -> None:
         self._client = None
 
-    async def summarize(
+    async def summarize_cached(
         self,
         content: str,
         max_length: int = 500,
-        focus: str | None = None
-    ) -> str:
+        focus: str | None = None,
+        content_hash: str | None = None,
+        priority: int = INTERACTIVE,
+        on_delta: Callable[[str], None] | None = None
+    ) -> SummaryResult:
+        """Summarize through the summary cache.
+
+        on_delta receives the text as it is generated. Callers that join a
+        generation already in flight only get the final summary. If every
+        caller is cancelled, the generation is cancelled too.
+        """
+        content_hash = content_hash or cache.hash_content(content)
+        cached = await cache.get_summary(content_hash, focus, self.model, max_length)
+        if cached is not None:
+            return SummaryResult(cached, True)
+
+        summary_key = cache.hash_summary(content_hash, focus, self.model, max_length)
+        try:
+            summary, input_ratio = await singleflight.do(
+                f"summary:{summary_key}",
+                lambda: self._generate_and_cache(
+                    content, content_hash, max_length, focus, priority, on_delta
+                ),
+                cancel_when_abandoned=True,
+            )
+            return SummaryResult(summary, False, input_ratio)
+        except Exception as e:
+            return SummaryResult(f"[Summarization failed: {str(e)}]", False)
+
+    async def _generate_and_cache(
+        self,
+        content: str,
+        content_hash: str,
+        max_length: int,
+        focus: str | None,
+        priority: int,
+        on_delta: Callable[[str], None] | None
+    ) -> tuple[str, float]:
+        summary, input_ratio = await self._generate(
+            content, max_length, focus, priority, on_delta
+        )
+        await cache.set_summary(content_hash, focus, self.model, max_length, summary)
+        return summary, input_ratio
+
+    async def _generate(
+        self,
+        content: str,
+        max_length: int,
+        focus: str | None,
+        priority: int = INTERACTIVE,
+        on_delta: Callable[[str], None] | None = None
+    ) -> tuple[str, float]:
+        """Returns the summary and the share of content sent to the model."""
         if not self._client:
             await self.initialize()
 
-        content_preview = content[:10000]
+        # Only the passages most relevant to the focus fit the token budget.
+        selection = await asyncio.to_thread(select_passages, content, focus)
+        content_preview = selection.text
 
         if focus:
             prompt = f"""Summarize the following web content, focusing on: {focus}
@@ -47,27 +163,45 @@ Content:
 
 Summary:"""
 
-        try:
-            response = await self._client.chat(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that summarizes web content clearly and concisely."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                options={
-                    "temperature": 0.3,
-                    "num_predict": max_length * 2,
-                }
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant that summarizes web content clearly and concisely."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        options = {
+            "temperature": 0.3,
+            "num_predict": max_length * 2,
+        }
+
+        async with self.scheduler.slot(priority):
+            if on_delta is None:
+                response = await self._client.chat(
+                    model=self.model, messages=messages, options=options
+                )
+                return response["message"]["content"].strip(), selection.ratio
+
+            parts = []
+            stream = await self._client.chat(
+                model=self.model, messages=messages, options=options, stream=True
             )
-            return response["message"]["content"].strip()
-        except Exception as e:
-            return f"[Summarization failed: {str(e)}]"
+            async for chunk in stream:
+                delta = chunk["message"]["content"]
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+            return "".join(parts).strip(), selection.ratio
+
+    def stats(self) -> dict:
+        return {
+            "active": self.scheduler.active,
+            "queued": self.scheduler.queued(),
+            "max_concurrency": self.scheduler.max_concurrency,
+        }
 
     async def is_available(self) -> bool:
         if not self._client:
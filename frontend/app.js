@@ -45,6 +45,7 @@ document.getElementById('search-form').addEventListener('submit', async (e) => {
                 extract,
                 summarize,
                 bypass_cache: bypassCache,
+                stream: true,
             }),
         });
 
@@ -52,50 +53,40 @@ document.getElementById('search-form').addEventListener('submit', async (e) => {
             throw new Error(`Search failed: ${response.status}`);
         }
 
-        const data = await response.json();
-
-        let timing = `Search: ${data.search_time_ms}ms`;
-        if (data.extract_time_ms) timing += ` | Extract: ${data.extract_time_ms}ms`;
-        if (data.summarize_time_ms) timing += ` | Summarize: ${data.summarize_time_ms}ms`;
-
-        statusEl.className = 'status-message success';
-        statusEl.textContent = `Found ${data.total_results} results (${timing})`;
-
-        resultsEl.innerHTML = data.results.map((result, index) => `
-            <div class="result-card">
-                <div class="result-header">
-                    <div>
-                        <div class="result-title">
-                            <a href="${escapeHtml(result.url)}" target="_blank" rel="noopener">
-                                ${index + 1}. ${escapeHtml(result.title || 'Untitled')}
-                            </a>
-                        </div>
-                        <div class="result-url">${escapeHtml(result.url)}</div>
-                    </div>
-                    <div style="display: flex; gap: 0.5rem;">
-                        ${result.from_cache ? '<span class="result-badge cached">Cached</span>' : ''}
-                        ${result.engine ? `<span class="result-badge engine">${escapeHtml(result.engine)}</span>` : ''}
-                    </div>
-                </div>
-                <div class="result-snippet">${escapeHtml(result.snippet || '')}</div>
-                ${result.summary ? `
-                    <div class="result-summary">
-                        <div class="result-summary-label">AI Summary</div>
-                        ${escapeHtml(result.summary)}
-                    </div>
-                ` : ''}
-                ${result.markdown ? `
-                    <div class="result-content">${escapeHtml(result.markdown.slice(0, 500))}${result.markdown.length > 500 ? '...' : ''}</div>
-                    <div class="result-actions">
-                        <button class="btn secondary" onclick="showFullContent('${escapeHtml(result.title || 'Content')}', ${index}, 'search')">
-                            View Full Content
-                        </button>
-                    </div>
-                ` : ''}
-            </div>
-        `).join('');
-
-        window.lastSearchResults = data.results;
+        let results = [];
+        window.lastSearchResults = results;
+
+        await readNdjson(response, (event) => {
+            if (event.event === 'error') {
+                throw new Error(event.detail);
+            }
+            if (event.event === 'hits') {
+                results = event.results;
+                window.lastSearchResults = results;
+                resultsEl.innerHTML = results.map(renderSearchResult).join('');
+                statusEl.textContent = `Found ${results.length} results, loading content...`;
+            } else if (['result', 'summary_delta', 'summary'].includes(event.event)) {
+                if (event.event === 'result') {
+                    results[event.index] = event.result;
+                } else if (event.event === 'summary_delta') {
+                    results[event.index].summary = (results[event.index].summary || '') + event.text;
+                } else {
+                    results[event.index].summary = event.summary;
+                    results[event.index].summary_from_cache = event.summary_from_cache;
+                }
+                const card = resultsEl.children[event.index];
+                if (card) {
+                    card.outerHTML = renderSearchResult(results[event.index], event.index);
+                }
+            } else if (event.event === 'done') {
+                let timing = `Search: ${event.search_time_ms}ms`;
+                if (event.extract_time_ms) timing += ` | Extract: ${event.extract_time_ms}ms`;
+                if (event.summarize_time_ms) timing += ` | Summarize: ${event.summarize_time_ms}ms`;
+
+                statusEl.className = 'status-message success';
+                statusEl.textContent = `Found ${event.total_results} results (${timing})`;
+            }
+        });
 
     } catch (error) {
         statusEl.className = 'status-message error';
@@ -105,6 +96,67 @@ document.getElementById('search-form').addEventListener('submit', async (e) => {
     }
 });
 
+function renderSearchResult(result, index) {
+    return `
+        <div class="result-card">
+            <div class="result-header">
+                <div>
+                    <div class="result-title">
+                        <a href="${escapeHtml(result.url)}" target="_blank" rel="noopener">
+                            ${index + 1}. ${escapeHtml(result.title || 'Untitled')}
+                        </a>
+                    </div>
+                    <div class="result-url">${escapeHtml(result.url)}</div>
+                </div>
+                <div style="display: flex; gap: 0.5rem;">
+                    ${result.from_cache ? '<span class="result-badge cached">Cached</span>' : ''}
+                    ${result.stale ? '<span class="result-badge cached">Stale</span>' : ''}
+                    ${result.truncated ? '<span class="result-badge cached">Truncated</span>' : ''}
+                    ${result.engine ? `<span class="result-badge engine">${escapeHtml(result.engine)}</span>` : ''}
+                </div>
+            </div>
+            <div class="result-snippet">${escapeHtml(result.snippet || '')}</div>
+            ${result.summary ? `
+                <div class="result-summary">
+                    <div class="result-summary-label">AI Summary${result.summary_from_cache ? ' (cached)' : ''}</div>
+                    ${escapeHtml(result.summary)}
+                </div>
+            ` : ''}
+            ${result.markdown ? `
+                <div class="result-content">${escapeHtml(result.markdown.slice(0, 500))}${result.markdown.length > 500 ? '...' : ''}</div>
+                <div class="result-actions">
+                    <button class="btn secondary" onclick="showFullContent('${escapeHtml(result.title || 'Content')}', ${index}, 'search')">
+                        View Full Content
+                    </button>
+                </div>
+            ` : ''}
+        </div>
+    `;
+}
+
+// Read a newline-delimited JSON stream, calling onEvent for each object
+async function readNdjson(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) onEvent(JSON.parse(line));
+        }
+
+        if (done) break;
+    }
+
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
 // Fetch form
 document.getElementById('fetch-form').addEventListener('submit', async (e) => {
     e.preventDefault();
@@ -163,11 +215,12 @@ document.getElementById('fetch-form').addEventListener('submit', async (e) => {
                             ${data.changed_since_last !== null ? ` | Changed: ${data.changed_since_last ? 'Yes' : 'No'}` : ''}
                         </div>
                     </div>
-                    ${data.from_cache ? '<span class="result-badge cached">Cached</span>' : ''}
+                    ${data.from_cache ? `<span class="result-badge cached">${data.stale ? 'Stale' : 'Cached'}</span>` : ''}
+                    ${data.truncated ? '<span class="result-badge cached">Truncated</span>' : ''}
                 </div>
                 ${data.summary ? `
                     <div class="result-summary">
-                        <div class="result-summary-label">AI Summary</div>
+                        <div class="result-summary-label">AI Summary${data.summary_from_cache ? ' (cached)' : ''}</div>
                         ${escapeHtml(data.summary)}
                     </div>
                 ` : ''}
@@ -221,8 +274,42 @@ document.getElementById('refresh-status').addEventListener('click', async () =>
                 </div>
                 <div class="status-item">
                     <span class="label">Playwright Contexts</span>
-                    <span class="value">${data.playwright_contexts}</span>
+                    <span class="value">
+                        ${data.playwright_in_use ?? 0} / ${data.playwright_contexts} in use, ${data.playwright_idle ?? 0} warm
+                    </span>
                 </div>
+                ${data.cache_entries !== null ? `
+                    <div class="status-item">
+                        <span class="label">Cache</span>
+                        <span class="value">
+                            ${data.cache_entries} entries, ${formatBytes(data.cache_bytes_on_disk)}, ${data.cache_evictions} evicted
+                        </span>
+                    </div>
+                ` : ''}
+                ${data.browser_state ? `
+                    <div class="status-item">
+                        <span class="label">Browser</span>
+                        <span class="value ${data.browser_state === 'crashed' ? 'error' : (data.browser_state === 'running' ? 'ok' : '')}">
+                            ${data.browser_state}${data.browser_rss_bytes ? `, ${formatBytes(data.browser_rss_bytes)}` : ''}, ${data.browser_crashes} crashes, ${data.browser_recycles} recycles
+                        </span>
+                    </div>
+                ` : ''}
+                ${data.fetch_connections !== null ? `
+                    <div class="status-item">
+                        <span class="label">HTTP Pool</span>
+                        <span class="value">
+                            ${data.fetch_connections} connections (${data.fetch_idle_connections} idle, ${data.fetch_http2_connections} HTTP/2)
+                        </span>
+                    </div>
+                ` : ''}
+                ${data.ollama_active !== null ? `
+                    <div class="status-item">
+                        <span class="label">Summaries</span>
+                        <span class="value">
+                            ${data.ollama_active} running, ${data.ollama_queued} queued
+                        </span>
+                    </div>
+                ` : ''}
             </div>
         `;
     } catch (error) {
@@ -278,6 +365,13 @@ document.addEventListener('keydown', (e) => {
 });
 
 // Utility
+function formatBytes(bytes) {
+    if (!bytes) return '0 B';
+    const units = ['B', 'KB', 'MB', 'GB'];
+    const i = Math.min(Math.floor(Math.log(bytes) / Math.log(1024)), units.length - 1);
+    return `${(bytes / Math.pow(1024, i)).toFixed(i ? 1 : 0)} ${units[i]}`;
+}
+
 function escapeHtml(text) {
     if (!text) return '';
     const div = document.createElement('div');
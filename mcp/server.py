@@ -1,6 +1,7 @@
 import os
+import json
 import httpx
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 
 API_URL = os.environ.get("API_URL", "http://api:8000")
 
@@ -15,6 +16,9 @@ async def web_search(
     summarize: bool = False,
     bypass_cache: bool = False,
     engines: list[str] | None = None,
+    timeout_ms: int = 100000,
+    passages: int | None = None,
+    ctx: Context | None = None,
 ) -> dict:
     """
     Search the web and extract content from results.
@@ -26,6 +30,10 @@ async def web_search(
         summarize: Whether to generate AI summaries of the content
         bypass_cache: Skip cache and fetch fresh results
         engines: Specific search engines to use (e.g., ["duckduckgo", "brave"])
+        timeout_ms: Time budget; results not ready by then have status "timeout"
+        passages: Return only this many passages per result that best match the
+            query instead of the full markdown, keeping the response small;
+            requires extract
 
     Returns:
         Search results with optional markdown content and summaries
@@ -37,13 +45,59 @@ async def web_search(
             "extract": extract,
             "summarize": summarize,
             "bypass_cache": bypass_cache,
+            "stream": True,
+            "timeout_ms": timeout_ms,
         }
         if engines:
             payload["engines"] = engines
-
-        response = await client.post(f"{API_URL}/api/search", json=payload)
-        response.raise_for_status()
-        return response.json()
+        if passages:
+            payload["passages"] = passages
+
+        # Consume the NDJSON stream so progress is reported per result
+        # instead of waiting for the slowest page.
+        data: dict = {"query": query, "results": []}
+        steps = 0
+        async with client.stream("POST", f"{API_URL}/api/search", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                kind = event.pop("event")
+
+                if kind == "error":
+                    raise RuntimeError(event["detail"])
+                if kind == "hits":
+                    data["results"] = event["results"]
+                    data["search_time_ms"] = event["search_time_ms"]
+                elif kind == "result":
+                    data["results"][event["index"]] = event["result"]
+                elif kind == "summary":
+                    data["results"][event["index"]]["summary"] = event["summary"]
+                    data["results"][event["index"]]["summary_from_cache"] = event["summary_from_cache"]
+                    data["results"][event["index"]]["summary_input_ratio"] = event["summary_input_ratio"]
+                elif kind == "summary_delta":
+                    continue
+                elif kind == "passages":
+                    for result, selected in zip(data["results"], event["results"]):
+                        result["passages"] = selected
+                    continue
+                elif kind == "done":
+                    data.update(event)
+                    timed_out = set(event["timed_out"])
+                    for index, result in enumerate(data["results"]):
+                        if index in timed_out:
+                            result["status"] = "timeout"
+                        elif result["status"] == "pending":
+                            result["status"] = "ok"
+                    continue
+
+                steps += 1
+                if ctx:
+                    total = 1 + len(data["results"]) * (int(extract) + int(summarize))
+                    await ctx.report_progress(steps, total)
+
+        return data
 
 
 @mcp.tool()
@@ -52,6 +106,7 @@ async def fetch_page(
     force_js: bool = False,
     summarize: bool = False,
     bypass_cache: bool = False,
+    timeout_ms: int = 50000,
 ) -> dict:
     """
     Fetch a specific URL and extract its content as markdown.
@@ -61,6 +116,8 @@ async def fetch_page(
         force_js: Force JavaScript rendering (use for SPAs and dynamic sites)
         summarize: Whether to generate an AI summary of the content
         bypass_cache: Skip cache and fetch fresh content
+        timeout_ms: Time budget; the page is returned without its summary if
+            the summary is not ready by then
 
     Returns:
         Extracted markdown content with metadata
@@ -71,6 +128,7 @@ async def fetch_page(
             "force_js": force_js,
             "summarize": summarize,
             "bypass_cache": bypass_cache,
+            "timeout_ms": timeout_ms,
         }
 
         response = await client.post(f"{API_URL}/api/fetch", json=payload)
@@ -78,6 +136,39 @@ async def fetch_page(
         return response.json()
 
 
+@mcp.tool()
+async def fetch_pages(
+    urls: list[str],
+    force_js: bool = False,
+    summarize: bool = False,
+    bypass_cache: bool = False,
+) -> dict:
+    """
+    Fetch several URLs at once and extract their content as markdown.
+
+    Args:
+        urls: The URLs to fetch
+        force_js: Force JavaScript rendering (use for SPAs and dynamic sites)
+        summarize: Whether to generate AI summaries of the content
+        bypass_cache: Skip cache and fetch fresh content
+
+    Returns:
+        One entry per URL with its status and extracted content; URLs that
+        fail are reported individually instead of failing the whole call
+    """
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        payload = {
+            "urls": urls,
+            "force_js": force_js,
+            "summarize": summarize,
+            "bypass_cache": bypass_cache,
+        }
+
+        response = await client.post(f"{API_URL}/api/fetch/batch", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+
 @mcp.tool()
 async def check_page_changed(
     url: str,